@@ -13,8 +13,8 @@ CREATE TABLE IF NOT EXISTS patients (
     city VARCHAR(100),
     state VARCHAR(50),
     zip_code VARCHAR(10),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Patient Medical History
@@ -25,8 +25,8 @@ CREATE TABLE IF NOT EXISTS patient_medical_history (
     diagnosis_date DATE,
     status VARCHAR(50), -- active, resolved, inactive
     severity_level VARCHAR(20), -- mild, moderate, severe
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Medications Table
@@ -39,8 +39,8 @@ CREATE TABLE IF NOT EXISTS medications (
     start_date DATE,
     end_date DATE,
     reason_prescribed TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Allergies Table
@@ -50,22 +50,22 @@ CREATE TABLE IF NOT EXISTS allergies (
     allergen VARCHAR(255) NOT NULL,
     reaction_type VARCHAR(100),
     severity VARCHAR(20), -- mild, moderate, severe
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Consultation Sessions
 CREATE TABLE IF NOT EXISTS consultation_sessions (
     session_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     patient_id UUID NOT NULL REFERENCES patients(patient_id) ON DELETE CASCADE,
-    start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    end_time TIMESTAMP,
+    start_time TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    end_time TIMESTAMPTZ,
     triage_level VARCHAR(20), -- emergency, urgent, routine
     initial_complaint TEXT,
     final_assessment TEXT,
     draft_response TEXT,
     critique_score INTEGER,
     status VARCHAR(50), -- active, completed, archived
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Conversation Logs
@@ -74,7 +74,7 @@ CREATE TABLE IF NOT EXISTS conversation_logs (
     session_id UUID NOT NULL REFERENCES consultation_sessions(session_id) ON DELETE CASCADE,
     role VARCHAR(50), -- user, assistant, system
     message_content TEXT NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     reflection_details JSONB
 );
 
@@ -86,7 +86,7 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     session_id UUID REFERENCES consultation_sessions(session_id),
     details JSONB,
     user_role VARCHAR(50),
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    timestamp TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Create Indexes for Performance
@@ -98,6 +98,7 @@ CREATE INDEX idx_sessions_patient_id ON consultation_sessions(patient_id);
 CREATE INDEX idx_sessions_triage_level ON consultation_sessions(triage_level);
 CREATE INDEX idx_conversation_logs_session_id ON conversation_logs(session_id);
 CREATE INDEX idx_audit_logs_patient_id ON audit_logs(patient_id);
+CREATE INDEX idx_audit_logs_session_id ON audit_logs(session_id);
 
 -- Grant Permissions
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO neuro_user;
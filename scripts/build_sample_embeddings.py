@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Build the frozen embeddings for MedicalKnowledgeIngester.SAMPLE_DOCUMENTS.
+
+Writes src/infrastructure/sample_docs.npy (float32, one row per document)
+and its .fingerprint sidecar (hash of the embedding model and texts).
+Re-run whenever SAMPLE_DOCUMENTS or the embedding model changes.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import logging
+
+from src.infrastructure.ingest_docs import MedicalKnowledgeIngester
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+
+if __name__ == "__main__":
+    sys.exit(0 if MedicalKnowledgeIngester.build_sample_embeddings() else 1)
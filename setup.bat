@@ -43,6 +43,7 @@ REM Install dependencies
 echo.
 echo [3/5] Installing dependencies...
 pip install -q -r requirements.txt
+pip install -q -e .
 echo ✓ Dependencies installed
 
 REM Start Docker services
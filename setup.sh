@@ -40,6 +40,7 @@ fi
 echo ""
 echo "[3/5] Installing dependencies..."
 pip install -q -r requirements.txt
+pip install -q -e .
 echo "✓ Dependencies installed"
 
 # Start Docker services
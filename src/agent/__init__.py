@@ -1,7 +1,7 @@
 """Main agent interface."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from uuid import uuid4
 
 from src.agent.workflow import parm_workflow
@@ -54,26 +54,7 @@ class NeuroTriageAgent:
             final_state = self.workflow.invoke(state_dict)
 
             # Format response
-            return {
-                "session_id": final_state.session_id,
-                "patient_id": final_state.patient_id,
-                "final_response": final_state.final_response,
-                "triage_level": final_state.triage_level,
-                "triage_confidence": final_state.triage_confidence,
-                "critique_score": final_state.critique_score,
-                "critique_feedback": final_state.critique_feedback,
-                "response_status": final_state.response_status,
-                "safety_violations": final_state.safety_violations,
-                "reflection_iterations": final_state.reflection_iterations,
-                "metadata": {
-                    "total_latency_ms": final_state.total_latency_ms,
-                    "retrieval_latency_ms": final_state.retrieval_latency_ms,
-                    "generation_latency_ms": final_state.generation_latency_ms,
-                    "critique_latency_ms": final_state.critique_latency_ms,
-                },
-                "success": not final_state.is_error,
-                "error": final_state.error_message if final_state.is_error else None,
-            }
+            return self._format_result(final_state)
 
         except Exception as e:
             logger.error(f"Agent processing failed: {e}")
@@ -85,6 +66,85 @@ class NeuroTriageAgent:
                 "response_status": "error",
             }
 
+    def process_query_stream(
+        self,
+        patient_id: str,
+        user_input: str,
+        session_id: str = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a patient query, yielding progress events as nodes finish.
+
+        Yields a `triage` event once the planner has classified urgency, a
+        `critique` event per reflection round, and a terminal `result`
+        event with the same payload as `process_query`. Draft text is not
+        streamed because it may still be refined or escalated by the critic.
+        """
+        if not session_id:
+            session_id = str(uuid4())
+
+        state_dict = {
+            "patient_id": patient_id,
+            "session_id": session_id,
+            "user_input": user_input,
+        }
+
+        try:
+            final_state = None
+            for node_name, state in self.workflow.stream(state_dict):
+                final_state = state
+                if node_name == "planner":
+                    yield {
+                        "event": "triage",
+                        "session_id": session_id,
+                        "triage_level": state.triage_level,
+                        "triage_confidence": state.triage_confidence,
+                    }
+                elif node_name == "critic":
+                    yield {
+                        "event": "critique",
+                        "session_id": session_id,
+                        "critique_score": state.critique_score,
+                        "reflection_iterations": state.reflection_iterations,
+                    }
+
+            yield {"event": "result", **self._format_result(final_state)}
+
+        except Exception as e:
+            logger.error(f"Agent streaming failed: {e}")
+            yield {
+                "event": "result",
+                "session_id": session_id,
+                "patient_id": patient_id,
+                "success": False,
+                "error": str(e),
+                "response_status": "error",
+            }
+
+    @staticmethod
+    def _format_result(final_state: AgentState) -> Dict[str, Any]:
+        """Format a final workflow state as the agent response dict."""
+        return {
+            "session_id": final_state.session_id,
+            "patient_id": final_state.patient_id,
+            "final_response": final_state.final_response,
+            "triage_level": final_state.triage_level,
+            "triage_confidence": final_state.triage_confidence,
+            "critique_score": final_state.critique_score,
+            "critique_feedback": final_state.critique_feedback,
+            "response_status": final_state.response_status,
+            "safety_violations": final_state.safety_violations,
+            "reflection_iterations": final_state.reflection_iterations,
+            "metadata": {
+                "total_latency_ms": final_state.total_latency_ms,
+                "retrieval_latency_ms": final_state.retrieval_latency_ms,
+                "generation_latency_ms": final_state.generation_latency_ms,
+                "critique_latency_ms": final_state.critique_latency_ms,
+            },
+            "success": not final_state.is_error,
+            "error": final_state.error_message if final_state.is_error else None,
+        }
+
 
 # Global agent instance
 agent = NeuroTriageAgent()
@@ -1,9 +1,11 @@
 """Core PARM agent nodes for LangGraph."""
 
+import json
 import logging
 import time
 from typing import Dict, Any
 
+from src.config import settings
 from src.agent.state import AgentState
 from src.agent.tools import (
     retrieval_tool,
@@ -12,11 +14,19 @@ from src.agent.tools import (
     embedding_manager,
 )
 from src.safety.guardrails import SafetyGuardrail, TriageLevel
-from src.safety.pii_protection import pii_protector
+from src.safety.pii_protection import get_pii_protector
 from src.safety.hallucination_detector import HallucinationDetector
+from src.infrastructure.redis_manager import redis_manager
 
 logger = logging.getLogger(__name__)
 
+# Planner confidence per triage level
+_TRIAGE_CONFIDENCE = {
+    TriageLevel.EMERGENCY: 0.95,
+    TriageLevel.URGENT: 0.85,
+    TriageLevel.ROUTINE: 0.70,
+}
+
 
 class PlannerNode:
     """Planner Node: Triage and classify patient urgency (System 1)."""
@@ -25,11 +35,11 @@ class PlannerNode:
     def execute(state: AgentState) -> AgentState:
         """Execute triage classification."""
         start_time = time.time()
-        logger.info(f"[PLANNER] Processing: {state.patient_id}")
+        logger.info("[PLANNER] Processing: %s", state.patient_id)
 
         try:
             # Mask PII from input
-            masked_input = pii_protector.mask_pii(state.user_input)
+            masked_input = get_pii_protector().mask_pii(state.user_input)
 
             # Get patient context for triage
             patient_data = patient_context_tool.get_patient_context(state.patient_id)
@@ -41,21 +51,16 @@ class PlannerNode:
             )
 
             # Set confidence based on presence of emergency keywords
-            if triage_level == TriageLevel.EMERGENCY:
-                confidence = 0.95
-            elif triage_level == TriageLevel.URGENT:
-                confidence = 0.85
-            else:
-                confidence = 0.70
+            confidence = _TRIAGE_CONFIDENCE[triage_level]
 
             state.triage_level = triage_level
             state.triage_confidence = confidence
             state.patient_context = patient_data if isinstance(patient_data, dict) else {}
 
-            logger.info(f"[PLANNER] Triage: {triage_level} (confidence: {confidence})")
+            logger.info("[PLANNER] Triage: %s (confidence: %s)", triage_level, confidence)
 
         except Exception as e:
-            logger.error(f"[PLANNER] Error: {e}")
+            logger.error("[PLANNER] Error: %s", e)
             state.is_error = True
             state.error_message = f"Planning error: {str(e)}"
 
@@ -70,7 +75,7 @@ class ActorNode:
     def execute(state: AgentState) -> AgentState:
         """Execute retrieval and response generation."""
         start_time = time.time()
-        logger.info(f"[ACTOR] Generating response for: {state.patient_id}")
+        logger.info("[ACTOR] Generating response for: %s", state.patient_id)
 
         try:
             # If emergency, skip to hard-coded response
@@ -148,7 +153,7 @@ Respond as a clinical decision support tool, not a doctor."""
                 logger.info("[ACTOR] Draft generated successfully")
 
         except Exception as e:
-            logger.error(f"[ACTOR] Error: {e}")
+            logger.error("[ACTOR] Error: %s", e)
             state.is_error = True
             state.error_message = f"Actor error: {str(e)}"
 
@@ -162,7 +167,7 @@ class CriticNode:
     def execute(state: AgentState) -> AgentState:
         """Execute critique and evaluation."""
         start_time = time.time()
-        logger.info(f"[CRITIC] Evaluating response (iteration {state.reflection_iterations + 1})")
+        logger.info("[CRITIC] Evaluating response (iteration %d)", state.reflection_iterations + 1)
 
         try:
             # Skip critique for emergency responses
@@ -174,8 +179,6 @@ class CriticNode:
                 return state
 
             # Perform safety checks
-            from src.config import settings
-            
             patient_conditions = [
                 h["condition"] for h in state.patient_context.get("medical_history", [])
             ]
@@ -202,7 +205,7 @@ class CriticNode:
                 state.critique_score = 1  # Dangerous - do not approve
                 state.critique_feedback = f"CONTRAINDICATION DETECTED: {contraindication_msg}"
                 state.is_approved = False
-                logger.error(f"[CRITIC] CONTRAINDICATION: {contraindication_msg}")
+                logger.error("[CRITIC] CONTRAINDICATION: %s", contraindication_msg)
                 return state
 
             # Check for hallucinations in response
@@ -215,7 +218,7 @@ class CriticNode:
             # If hallucinations detected, flag as unsafe
             if is_hallucinating:
                 state.safety_violations.append(f"HALLUCINATION: {hallucination_feedback}")
-                logger.warning(f"[CRITIC] HALLUCINATION: {hallucination_feedback}")
+                logger.warning("[CRITIC] HALLUCINATION: %s", hallucination_feedback)
 
             # Validate response
             response_safe, response_msg = SafetyGuardrail.validate_response(
@@ -253,7 +256,6 @@ Respond with ONLY a JSON object: {{"score": <1-5>, "feedback": "<brief explanati
 
             # Parse critique score
             try:
-                import json
                 critique_data = json.loads(critique_response)
                 state.critique_score = critique_data.get("score", 3)
                 state.critique_feedback = critique_data.get("feedback", "No feedback")
@@ -268,11 +270,11 @@ Respond with ONLY a JSON object: {{"score": <1-5>, "feedback": "<brief explanati
             # Set approval status based on score
             state.is_approved = state.critique_score >= settings.safety_score_min
 
-            logger.info(f"[CRITIC] Score: {state.critique_score}/5 - {state.critique_feedback}")
+            logger.info("[CRITIC] Score: %s/5 - %s", state.critique_score, state.critique_feedback)
             state.reflection_iterations += 1
 
         except Exception as e:
-            logger.error(f"[CRITIC] Error: {e}")
+            logger.error("[CRITIC] Error: %s", e)
             state.critique_score = 2
             state.critique_feedback = f"Critique error: {str(e)}"
             state.is_approved = False
@@ -286,11 +288,9 @@ class MemoryNode:
     @staticmethod
     def execute(state: AgentState) -> AgentState:
         """Store state in memory systems."""
-        logger.info(f"[MEMORY] Storing session: {state.session_id}")
+        logger.info("[MEMORY] Storing session: %s", state.session_id)
 
         try:
-            from src.infrastructure.redis_manager import redis_manager
-            
             # Set final response and status based on approval
             if state.is_error:
                 state.final_response = f"Error processing request: {state.error_message}"
@@ -326,7 +326,7 @@ class MemoryNode:
             logger.info("[MEMORY] Session stored in Redis")
 
         except Exception as e:
-            logger.error(f"[MEMORY] Error: {e}")
+            logger.error("[MEMORY] Error: %s", e)
             state.final_response = "System error - please try again"
             state.response_status = "error"
 
@@ -5,7 +5,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)  # rebuilt from dicts at every node; no per-instance __dict__
 class AgentState:
     """
     State representation for the PARM (Planning, Action, Reflection, Memory) agent.
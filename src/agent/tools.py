@@ -1,37 +1,179 @@
 """LLM tools for agent reasoning."""
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Tuple
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Tuple
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.config import settings
 from src.infrastructure.qdrant_manager import qdrant_manager
+from src.infrastructure.redis_manager import redis_manager
 from src.memory.patient_manager import PatientManager
 from src.infrastructure.database import get_session
 
 logger = logging.getLogger(__name__)
 
 
+class _EmbeddingBatcher:
+    """
+    Coalesce concurrent single-text embedding calls into batched requests.
+
+    Callers block on a future while a background worker collects texts for
+    up to `max_wait_seconds` (or `max_batch` texts) and embeds them together.
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], List[List[float]]],
+        max_batch: int,
+        max_wait_seconds: float,
+    ):
+        """Initialize the batcher; the worker thread starts on first use."""
+        self._embed_many = embed_many
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: "queue.SimpleQueue[Tuple[str, Future]]" = queue.SimpleQueue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding."""
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _run(self) -> None:
+        """Drain the queue into batches forever."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self._embed_many([text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Batched embedding failed ({len(batch)} texts): {e}")
+                vectors = [[] for _ in batch]
+
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
 class EmbeddingManager:
     """Manager for text embeddings."""
 
     def __init__(self):
         """Initialize embedding model."""
+        self.model = "text-embedding-3-small"
         self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
+            model=self.model,
             api_key=settings.openai_api_key,
         )
+        self._batcher = _EmbeddingBatcher(
+            self.embed_texts,
+            max_batch=settings.embedding_batch_max_size,
+            max_wait_seconds=settings.embedding_batch_wait_ms / 1000,
+        )
+
+    def _content_hash(self, text: str) -> str:
+        """Cache key for a text's embedding (model-scoped content hash)."""
+        return hashlib.blake2b(f"{self.model}\0{text}".encode("utf-8"), digest_size=20).hexdigest()
 
     def embed_text(self, text: str) -> List[float]:
-        """Embed a text string."""
+        """
+        Embed a text string.
+
+        Concurrent callers are micro-batched into one request (see
+        `_EmbeddingBatcher`); set `embedding_batch_wait_ms` to 0 to disable.
+        """
         try:
+            if self._batcher.max_wait_seconds > 0:
+                return self._batcher.submit(text).result()
             embedding = self.embeddings.embed_query(text)
             return embedding
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             return []
 
+    @staticmethod
+    def _request_batches(texts: List[str], max_chars: int, max_items: int) -> List[List[int]]:
+        """
+        Group text indices into request-sized batches (by char budget and count).
+
+        Indices are visited shortest-first so similar lengths share a request;
+        a few long documents then can't break up runs of short ones, and
+        requests fill closer to the budget.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches, current, current_chars = [], [], 0
+        for i in order:
+            text = texts[i]
+            if current and (current_chars + len(text) > max_chars or len(current) >= max_items):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(i)
+            current_chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed_texts(
+        self,
+        texts: List[str],
+        max_chars_per_request: int = 40000,
+        max_texts_per_request: int = 256,
+    ) -> List[List[float]]:
+        """
+        Embed many texts with as few API requests as possible.
+
+        Vectors already cached in Redis (keyed by content hash) are reused;
+        only misses are sent to the API, and their results are cached.
+        Returns one vector per input, in order; texts in a failed request
+        get an empty list, mirroring `embed_text`.
+        """
+        hashes = [self._content_hash(text) for text in texts]
+        cached = redis_manager.get_embeddings(hashes)
+        embeddings: List[List[float]] = [vector or [] for vector in cached]
+
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        missing_texts = [texts[i] for i in missing]
+        fresh: Dict[str, List[float]] = {}
+
+        for batch in self._request_batches(missing_texts, max_chars_per_request, max_texts_per_request):
+            try:
+                vectors = self.embeddings.embed_documents([missing_texts[j] for j in batch])
+                for j, vector in zip(batch, vectors):
+                    embeddings[missing[j]] = vector
+                    fresh[hashes[missing[j]]] = vector
+            except Exception as e:
+                logger.error(f"Batch embedding failed ({len(batch)} texts): {e}")
+
+        if missing:
+            logger.info(f"Embedded {len(missing)} texts ({len(texts) - len(missing)} from cache)")
+        redis_manager.set_embeddings(fresh)
+
+        return embeddings
+
 
 class RetrievalTool:
     """Tool for retrieving medical knowledge from Qdrant."""
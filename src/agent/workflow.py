@@ -1,7 +1,7 @@
 """LangGraph PARM workflow orchestration."""
 
 from langgraph.graph import StateGraph, END
-from typing import Literal
+from typing import Any, Dict, Iterator, Literal, Tuple
 from dataclasses import asdict, fields
 import logging
 
@@ -119,27 +119,37 @@ class PARMGraphWorkflow:
             )
             return "refine"
 
-    def invoke(self, state_dict: dict) -> AgentState:
-        """Execute the workflow."""
+    def invoke_dict(self, state_dict: dict) -> Dict[str, Any]:
+        """Execute the workflow, returning the final state as a plain dict."""
         logger.info(f"[WORKFLOW] Starting for patient {state_dict.get('patient_id')}")
         
         # Execute compiled graph with dict - StateGraph handles dict internally
         result = self.compiled_graph.invoke(state_dict)
-        
-        # Convert result dict back to AgentState
-        if isinstance(result, dict):
-            final_state = AgentState(**result)
-        else:
-            final_state = result
+        if not isinstance(result, dict):
+            result = asdict(result)
         
         logger.info(
             f"[WORKFLOW] Complete - "
-            f"Status: {final_state.response_status}, "
-            f"Iterations: {final_state.reflection_iterations}, "
-            f"Score: {final_state.critique_score}/5"
+            f"Status: {result.get('response_status')}, "
+            f"Iterations: {result.get('reflection_iterations')}, "
+            f"Score: {result.get('critique_score')}/5"
         )
         
-        return final_state
+        return result
+
+    def invoke(self, state_dict: dict) -> AgentState:
+        """Execute the workflow."""
+        return AgentState(**self.invoke_dict(state_dict))
+
+    def stream(self, state_dict: dict) -> Iterator[Tuple[str, AgentState]]:
+        """Execute the workflow, yielding (node_name, state) after each node."""
+        logger.info(f"[WORKFLOW] Streaming for patient {state_dict.get('patient_id')}")
+
+        state = dict(state_dict)
+        for update in self.compiled_graph.stream(state_dict, stream_mode="updates"):
+            for node_name, node_state in update.items():
+                state.update(node_state)
+                yield node_name, AgentState(**state)
 
 
 # Global workflow instance
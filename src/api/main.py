@@ -1,25 +1,82 @@
 """FastAPI backend for Neuro-Triage."""
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+import asyncio
+import hmac
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, Dict, List, Optional, Union
+from uuid import uuid4
+import msgspec
+import orjson
 import uvicorn
 
-from src.config import settings
+from src.config import get_settings
 from src.agent import agent
-from src.infrastructure.database import init_db
+from src.agent.tools import embedding_manager, patient_context_tool
+from src.infrastructure.database import async_engine, engine, init_db
+from src.infrastructure.ingest_docs import MedicalKnowledgeIngester
+from src.infrastructure.query_cache import query_cache
 from src.infrastructure.qdrant_manager import qdrant_manager
 from src.infrastructure.redis_manager import redis_manager
+from src.safety.guardrails import SafetyGuardrail
+from src.utils import hash_input
 
 logger = logging.getLogger(__name__)
 
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize values orjson can't encode natively (datetime/UUID are native)."""
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse with a fallback encoder for non-native types."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize and pre-warm backends before serving; release them on shutdown."""
+    logger.info("Starting Neuro-Triage API...")
+    try:
+        # Initialize once per process and open the Redis pool connection
+        # up front, so the first request doesn't pay for either
+        await asyncio.gather(
+            _initialize_backends(),
+            asyncio.to_thread(redis_manager.health_check),
+        )
+        logger.info("System ready for processing queries")
+    except Exception as e:
+        logger.warning(f"Startup warning: {e}")
+
+    yield
+
+    logger.info("Shutting down Neuro-Triage API...")
+    redis_manager.close()
+    await qdrant_manager.aclose()
+    engine.dispose()
+    await async_engine.dispose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Neuro-Triage API",
     description="Clinical Decision Support System using PARM Framework",
     version="0.1.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -33,12 +90,64 @@ app.add_middleware(
 
 
 # Request/Response Models
-class QueryRequest(BaseModel):
+# Request bodies are msgspec Structs: decoding + validation happens in one
+# C-level pass instead of building Pydantic models on every call.
+class QueryRequest(msgspec.Struct, frozen=True):
     """Patient query request."""
 
-    patient_id: str = Field(..., description="Unique patient identifier")
-    message: str = Field(..., description="Patient's input/symptoms")
-    session_id: Optional[str] = Field(None, description="Optional session ID")
+    patient_id: Annotated[str, msgspec.Meta(description="Unique patient identifier")]
+    message: Annotated[str, msgspec.Meta(description="Patient's input/symptoms")]
+    session_id: Annotated[Optional[str], msgspec.Meta(description="Optional session ID")] = None
+
+
+class BatchQueryRequest(msgspec.Struct, frozen=True):
+    """Batch of independent patient queries."""
+
+    queries: Annotated[
+        List[QueryRequest],
+        msgspec.Meta(
+            max_length=get_settings().batch_max_queries,
+            description="Queries to process concurrently",
+        ),
+    ]
+
+
+_query_decoder = msgspec.json.Decoder(QueryRequest)
+_batch_decoder = msgspec.json.Decoder(BatchQueryRequest)
+
+
+async def parse_query(request: Request) -> QueryRequest:
+    """Decode and validate a /chat body with msgspec."""
+    try:
+        return _query_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+async def parse_batch(request: Request) -> BatchQueryRequest:
+    """Decode and validate a /batch_chat body with msgspec."""
+    try:
+        return _batch_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+# msgspec schemas referenced from route docs, merged into the OpenAPI components
+_msgspec_schemas: Dict[str, Any] = {}
+
+
+def _msgspec_body(struct_type: type) -> Dict[str, Any]:
+    """OpenAPI requestBody for a msgspec-decoded route."""
+    (schema,), components = msgspec.json.schema_components(
+        [struct_type], ref_template="#/components/schemas/{name}"
+    )
+    _msgspec_schemas.update(components)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
 
 
 class TriageResponse(BaseModel):
@@ -50,12 +159,24 @@ class TriageResponse(BaseModel):
     triage_level: str
     triage_confidence: float
     critique_score: int
+    critique_feedback: Optional[str] = None
+    safety_violations: List[str] = Field(default_factory=list)
     response_status: str
     reflection_iterations: int
     success: bool
     error: Optional[str] = None
 
 
+class BatchQueryError(BaseModel):
+    """A /batch_chat entry for a query that failed."""
+
+    session_id: Optional[str] = None
+    patient_id: str
+    success: bool = False
+    error: Optional[str] = None
+    response_status: str = "error"
+
+
 class HealthCheckResponse(BaseModel):
     """Health check response."""
 
@@ -71,67 +192,252 @@ class HealthCheckResponse(BaseModel):
 async def health_check():
     """Check system health."""
     database_ok = True
-    qdrant_ok = qdrant_manager.health_check()
-    redis_ok = redis_manager.health_check()
+
+    # Run the blocking checks concurrently; a raised check counts as failed
+    qdrant_ok, redis_ok = await asyncio.gather(
+        asyncio.to_thread(qdrant_manager.health_check),
+        asyncio.to_thread(redis_manager.health_check),
+        return_exceptions=True,
+    )
+    qdrant_ok = qdrant_ok is True
+    redis_ok = redis_ok is True
     openai_ok = True  # We'll assume OK if API key is set
 
     status = "healthy" if all([database_ok, qdrant_ok, redis_ok, openai_ok]) else "degraded"
 
-    return {
+    return FastJSONResponse({
         "status": status,
         "database": database_ok,
         "qdrant": qdrant_ok,
         "redis": redis_ok,
         "openai": openai_ok,
-    }
+    })
 
 
-@app.post("/chat", response_model=TriageResponse)
-async def chat(request: QueryRequest):
-    """Process patient query."""
-    try:
-        logger.info(f"Processing query for patient {request.patient_id}")
+def _profile_version(profile: Dict[str, Any]) -> str:
+    """Content hash of a patient profile; changes whenever any field does."""
+    return hash_input(orjson.dumps(profile, default=_orjson_default, option=orjson.OPT_SORT_KEYS).decode())
 
-        result = agent.process_query(
+
+def _cached_answer_is_safe(request: QueryRequest, cached: Dict[str, Any], profile: Dict[str, Any]) -> bool:
+    """Re-run the cheap safety checks a cache hit would otherwise skip."""
+    # A near-duplicate query can still triage differently ("mild" vs
+    # "severe chest pain"); re-run the keyword triage
+    if SafetyGuardrail.classify_triage(request.message) != cached.get("triage_level"):
+        logger.info("Query cache hit discarded: triage level differs")
+        return False
+
+    safe, reason = SafetyGuardrail.check_contraindications(
+        recommended_medication=cached.get("final_response") or "",
+        patient_conditions=[h["condition"] for h in profile.get("medical_history", [])],
+        patient_medications=[m["name"] for m in profile.get("medications", [])],
+    )
+    if not safe:
+        logger.warning(f"Query cache hit discarded: {reason}")
+    return safe
+
+
+def _answer_query(request: QueryRequest) -> Dict[str, Any]:
+    """Answer one query, serving semantically repeated queries from the cache when enabled."""
+    if not get_settings().query_cache_enabled:
+        return agent.process_query(
             patient_id=request.patient_id,
             user_input=request.message,
             session_id=request.session_id,
         )
 
+    # Entries are keyed on the profile as it is now, so profile writes from
+    # any process (other workers, ETL, scripts) retire them
+    profile = patient_context_tool.get_patient_context(request.patient_id)
+    profile_version = None if "error" in profile else _profile_version(profile)
+    query_vector = embedding_manager.embed_text(request.message) if profile_version else None
+    cached = (
+        query_cache.lookup(request.patient_id, query_vector, profile_version) if query_vector else None
+    )
+    if cached is not None and not _cached_answer_is_safe(request, cached, profile):
+        cached = None
+
+    if cached is not None:
+        result = {**cached, "session_id": request.session_id or str(uuid4())}
+        redis_manager.set_session_state(result["session_id"], {
+            "patient_id": result["patient_id"],
+            "session_id": result["session_id"],
+            "triage_level": result.get("triage_level"),
+            "critique_score": result.get("critique_score"),
+            "reflection_iterations": result.get("reflection_iterations"),
+            "user_input": request.message,
+            "final_response": result.get("final_response"),
+            "response_status": result.get("response_status"),
+        })
+        return result
+
+    result = agent.process_query(
+        patient_id=request.patient_id,
+        user_input=request.message,
+        session_id=request.session_id,
+    )
+
+    if result.get("success") and query_vector:
+        query_cache.store(request.patient_id, query_vector, result, profile_version)
+
+    return result
+
+
+def _triage_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a trusted agent result as a TriageResponse dict without validation."""
+    return {field: result[field] for field in TriageResponse.model_fields if field in result}
+
+
+@app.post("/chat", response_model=TriageResponse, openapi_extra=_msgspec_body(QueryRequest))
+async def chat(request: QueryRequest = Depends(parse_query)):
+    """
+    Process patient query.
+
+    The agent result is produced in-process and trusted, so it is trimmed
+    to the TriageResponse fields (no validation) and returned as a
+    pre-serialized response, skipping both response-model validation and
+    jsonable_encoder.
+    `response_model` is kept for the OpenAPI schema only.
+    """
+    try:
+        logger.info(f"Processing query for patient {request.patient_id}")
+
+        result = await asyncio.to_thread(_answer_query, request)
+
         if not result.get("success"):
             raise HTTPException(status_code=500, detail=result.get("error", "Processing failed"))
 
-        return TriageResponse(
-            session_id=result["session_id"],
-            patient_id=result["patient_id"],
-            final_response=result["final_response"],
-            triage_level=result["triage_level"],
-            triage_confidence=result["triage_confidence"],
-            critique_score=result["critique_score"],
-            response_status=result["response_status"],
-            reflection_iterations=result["reflection_iterations"],
-            success=result["success"],
-            error=result.get("error"),
-        )
+        return FastJSONResponse(_triage_payload(result))
 
     except Exception as e:
         logger.error(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/initialize")
+def _sse_events(request: QueryRequest):
+    """Format agent progress events as server-sent events."""
+    for event in agent.process_query_stream(
+        patient_id=request.patient_id,
+        user_input=request.message,
+        session_id=request.session_id,
+    ):
+        payload = orjson.dumps(event, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        yield b"data: " + payload + b"\n\n"
+
+
+@app.post("/chat/stream", openapi_extra=_msgspec_body(QueryRequest))
+async def chat_stream(request: QueryRequest = Depends(parse_query)):
+    """
+    Process patient query, streaming progress as server-sent events.
+
+    The triage level is sent as soon as the planner finishes, ahead of
+    retrieval, generation and critique; the last event carries the result.
+    """
+    logger.info(f"Streaming query for patient {request.patient_id}")
+
+    # Sync generator: Starlette iterates it in a worker thread
+    return StreamingResponse(_sse_events(request), media_type="text/event-stream")
+
+
+# Batch queries in flight across all /batch_chat requests, so one large
+# batch can't take every worker thread from /chat
+_batch_slots = asyncio.Semaphore(get_settings().batch_max_concurrency)
+
+
+async def _answer_batch_query(query: QueryRequest) -> Dict[str, Any]:
+    """Answer one batch query once a batch slot is free."""
+    async with _batch_slots:
+        return await asyncio.to_thread(_answer_query, query)
+
+
+def _batch_error_payload(
+    query: QueryRequest,
+    error: Optional[str],
+    session_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Shape a failed batch query as a BatchQueryError dict."""
+    return BatchQueryError(
+        session_id=session_id or query.session_id,
+        patient_id=query.patient_id,
+        error=error,
+    ).model_dump()
+
+
+@app.post(
+    "/batch_chat",
+    response_model=List[Union[TriageResponse, BatchQueryError]],
+    openapi_extra=_msgspec_body(BatchQueryRequest),
+)
+async def batch_chat(request: BatchQueryRequest = Depends(parse_batch)):
+    """
+    Process independent patient queries concurrently.
+
+    Results are returned in request order. A failed query yields a
+    BatchQueryError entry (`success: false`) instead of failing the whole
+    batch. At most `batch_max_queries` queries are accepted per request.
+    """
+    logger.info(f"Processing batch of {len(request.queries)} queries")
+
+    results = await asyncio.gather(
+        *[_answer_batch_query(query) for query in request.queries],
+        return_exceptions=True,
+    )
+
+    payload = []
+    for query, result in zip(request.queries, results):
+        if isinstance(result, Exception):
+            logger.error(f"Batch query error: {result}")
+            payload.append(_batch_error_payload(query, str(result)))
+        elif not result.get("success"):
+            payload.append(_batch_error_payload(
+                query, result.get("error", "Processing failed"), result.get("session_id"),
+            ))
+        else:
+            payload.append(_triage_payload(result))
+
+    return FastJSONResponse(payload)
+
+
+async def _initialize_backends() -> None:
+    """Create DB tables and the Qdrant collection concurrently, then load the KB Bloom filter."""
+    await asyncio.gather(
+        asyncio.to_thread(init_db),
+        asyncio.to_thread(qdrant_manager.initialize_collection),
+    )
+    # Needs the collection; built from all of it so no KB term is missed
+    await asyncio.to_thread(MedicalKnowledgeIngester.load_kb_bloom)
+    logger.info("Database and Qdrant collection initialized")
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Reject admin calls without the configured token.
+
+    With no token configured, admin calls are open only in the development
+    environment. The comparison is constant-time.
+    """
+    settings = get_settings()
+    admin_token = settings.admin_token
+    if not admin_token:
+        if settings.environment != "development":
+            raise HTTPException(status_code=403, detail="Admin token not configured")
+        return
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode("utf-8"), admin_token.encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.post("/initialize", dependencies=[Depends(require_admin)])
 async def initialize_system():
-    """Initialize system (databases, collections, etc)."""
+    """Re-run system initialization (databases, collections, etc)."""
     try:
         logger.info("Initializing system...")
 
-        # Initialize database
-        init_db()
-        logger.info("Database initialized")
+        await _initialize_backends()
 
-        # Initialize Qdrant
-        qdrant_manager.initialize_collection()
-        logger.info("Qdrant collection initialized")
+        # Knowledge base may have changed - drop cached answers
+        query_cache.clear()
 
         return {"status": "initialized", "message": "System ready"}
 
@@ -144,12 +450,16 @@ async def initialize_system():
 async def get_session_details(session_id: str):
     """Retrieve session details."""
     try:
-        session_data = redis_manager.get_session_state(session_id)
+        # Hot sessions (e.g. UI polling) come from the in-process L1 without
+        # leaving the event loop; only misses pay a Redis round-trip in a thread
+        session_data = redis_manager.get_cached_session_state(session_id)
+        if session_data is None:
+            session_data = await asyncio.to_thread(redis_manager.get_session_state, session_id)
 
         if not session_data:
             raise HTTPException(status_code=404, detail="Session not found")
 
-        return session_data
+        return FastJSONResponse(session_data)
 
     except HTTPException:
         raise
@@ -158,37 +468,39 @@ async def get_session_details(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Semantic query cache statistics."""
+    return FastJSONResponse(query_cache.stats())
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
+    return FastJSONResponse({
         "name": "Neuro-Triage",
         "version": "0.1.0",
         "description": "Clinical Decision Support System using PARM Framework",
         "docs": "/docs",
         "health": "/health",
-    }
+    })
 
 
-# Startup/shutdown events
-@app.on_event("startup")
-async def startup_event():
-    """Run on startup."""
-    logger.info("Starting Neuro-Triage API...")
-    try:
-        # Try to verify API connectivity
-        logger.info("System ready for processing queries")
-    except Exception as e:
-        logger.warning(f"Startup warning: {e}")
+_default_openapi = app.openapi
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on shutdown."""
-    logger.info("Shutting down Neuro-Triage API...")
+def _openapi_with_msgspec_schemas() -> Dict[str, Any]:
+    """Generate the OpenAPI document including msgspec request schemas."""
+    schema = _default_openapi()
+    schema.setdefault("components", {}).setdefault("schemas", {}).update(_msgspec_schemas)
+    return schema
+
+
+app.openapi = _openapi_with_msgspec_schemas
 
 
 if __name__ == "__main__":
+    settings = get_settings()
     uvicorn.run(
         "src.api.main:app",
         host=settings.api_host,
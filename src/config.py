@@ -1,6 +1,7 @@
 """Configuration module for Neuro-Triage."""
 
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 import os
 
@@ -11,6 +12,8 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     openai_model: str = "gpt-4-turbo"
+    embedding_batch_max_size: int = 64
+    embedding_batch_wait_ms: float = 5
 
     # Qdrant
     qdrant_url: str = "http://localhost:6333"
@@ -22,9 +25,17 @@ class Settings(BaseSettings):
     db_host: str = "localhost"
     db_port: int = 5432
     db_name: str = "neuro_triage"
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle_seconds: int = 1800
 
     # Redis
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 64
+    redis_pool_timeout_seconds: float = 5
+    session_cache_max_entries: int = 1024
+    session_cache_ttl_seconds: float = 30
+    embedding_cache_ttl_seconds: int = 7 * 24 * 3600
 
     # Langfuse
     langfuse_public_key: Optional[str] = None
@@ -39,20 +50,34 @@ class Settings(BaseSettings):
 
     # Safety Thresholds
     hallucination_threshold: float = 0.3
+    # Fall through to knowledge base search for terms local checks can't decide
+    hallucination_kb_lookup: bool = True
     safety_score_min: int = 4
     triage_recall_target: float = 0.98
 
+    # Semantic Query Cache (off by default: cached answers skip generation
+    # and the critic; hits are re-checked for triage and contraindications)
+    query_cache_enabled: bool = False
+    query_cache_max_entries: int = 1024
+    query_cache_ttl_seconds: float = 3600
+    query_cache_similarity_threshold: float = 0.97
+
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    admin_token: Optional[str] = None
+    batch_max_queries: int = 50
+    batch_max_concurrency: int = 8
 
     # Streamlit
     streamlit_port: int = 8501
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        extra = "ignore"
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore",
+        frozen=True,
+    )
 
     @property
     def database_url(self) -> str:
@@ -62,6 +87,23 @@ class Settings(BaseSettings):
             f"{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        """Construct asyncpg PostgreSQL connection URL."""
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{self.db_password}@"
+            f"{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build settings once, on first use, and reuse the instance."""
+    return Settings()
+
 
-# Global settings instance
-settings = Settings()
+def __getattr__(name: str):
+    """Resolve the legacy `settings` global lazily (`from src.config import settings`)."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
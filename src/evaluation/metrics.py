@@ -1,11 +1,51 @@
 """Evaluation metrics for Neuro-Triage."""
 
 import logging
-from typing import List, Dict, Any, Tuple
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 import json
 
+import numpy as np
+
+from src.safety.guardrails import SafetyGuardrail
+
+try:
+    import ahocorasick
+except ImportError:  # Optional accelerator; fall back to a regex alternation
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Phrases flagged as unsupported claims by the hallucination heuristic
+# (stored casefolded so matching needs a single casefold of the response)
+HALLUCINATION_PHRASES = frozenset(p.casefold() for p in ("may cause", "always leads to"))
+
+
+def _build_automaton(phrases: frozenset):
+    """Build a multi-pattern matcher for `phrases` (Aho-Corasick, else regex)."""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            automaton.add_word(phrase, phrase)
+        automaton.make_automaton()
+        return automaton
+    # Longest first so a phrase is never shadowed by one of its prefixes
+    return re.compile("|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)))
+
+
+# Built once at import; every scan reuses it
+_HALLUCINATION_AUTOMATON = _build_automaton(HALLUCINATION_PHRASES)
+
+
+def _hallucination_phrases_in(text: str) -> set:
+    """Return the distinct hallucination phrases present in `text` (case-insensitive)."""
+    text = text.casefold()
+    if ahocorasick is not None:
+        return {phrase for _, phrase in _HALLUCINATION_AUTOMATON.iter(text)}
+    return set(_HALLUCINATION_AUTOMATON.findall(text))
+
 
 class EvaluationMetrics:
     """Compute evaluation metrics for clinical responses."""
@@ -23,11 +63,10 @@ class EvaluationMetrics:
         hallucination_count = 0
 
         for response in responses:
-            # Check for unsupported claims (simplified)
-            if "may cause" in response.get("response", "").lower():
-                hallucination_count += 1
-            if "always leads to" in response.get("response", "").lower():
-                hallucination_count += 1
+            # Check for unsupported claims (simplified) - one count per phrase found
+            hallucination_count += len(
+                _hallucination_phrases_in(response.get("response", ""))
+            )
 
         return hallucination_count / len(responses) if responses else 0
 
@@ -38,18 +77,15 @@ class EvaluationMetrics:
         
         Metric: Out of all true emergency cases, how many did we catch?
         """
-        true_positives = 0
-        false_negatives = 0
+        # object dtype keeps Python equality (TriageLevel is a str Enum)
+        pred = np.asarray(predictions[:len(ground_truth)], dtype=object)
+        truth = np.asarray(ground_truth[:len(predictions)], dtype=object)
 
-        for pred, truth in zip(predictions, ground_truth):
-            if truth == "emergency":
-                if pred == "emergency":
-                    true_positives += 1
-                else:
-                    false_negatives += 1
+        emergency_truth = truth == "emergency"
+        total_emergencies = np.count_nonzero(emergency_truth)
+        true_positives = np.count_nonzero(emergency_truth & (pred == "emergency"))
 
-        total_emergencies = true_positives + false_negatives
-        return true_positives / total_emergencies if total_emergencies > 0 else 0
+        return float(true_positives / total_emergencies) if total_emergencies > 0 else 0
 
     @staticmethod
     def triage_precision(predictions: List[str], ground_truth: List[str]) -> float:
@@ -58,18 +94,14 @@ class EvaluationMetrics:
         
         Metric: Out of all cases we flagged as emergency, how many were correct?
         """
-        true_positives = 0
-        false_positives = 0
+        pred = np.asarray(predictions[:len(ground_truth)], dtype=object)
+        truth = np.asarray(ground_truth[:len(predictions)], dtype=object)
 
-        for pred, truth in zip(predictions, ground_truth):
-            if pred == "emergency":
-                if truth == "emergency":
-                    true_positives += 1
-                else:
-                    false_positives += 1
+        emergency_pred = pred == "emergency"
+        total_predicted_emergency = np.count_nonzero(emergency_pred)
+        true_positives = np.count_nonzero(emergency_pred & (truth == "emergency"))
 
-        total_predicted_emergency = true_positives + false_positives
-        return true_positives / total_predicted_emergency if total_predicted_emergency > 0 else 0
+        return float(true_positives / total_predicted_emergency) if total_predicted_emergency > 0 else 0
 
     @staticmethod
     def latency_metrics(response_times: List[float]) -> Dict[str, float]:
@@ -77,13 +109,19 @@ class EvaluationMetrics:
         if not response_times:
             return {}
 
+        # One quickselect pass places all nearest-rank percentiles; no full sort
+        times = np.asarray(response_times, dtype=np.float64)
+        n = len(times)
+        median_k, p95_k, p99_k = n // 2, int(n * 0.95), int(n * 0.99)
+        partitioned = np.partition(times, [median_k, p95_k, p99_k])
+
         return {
-            "mean_latency_ms": sum(response_times) / len(response_times),
-            "median_latency_ms": sorted(response_times)[len(response_times) // 2],
-            "max_latency_ms": max(response_times),
-            "min_latency_ms": min(response_times),
-            "p95_latency_ms": sorted(response_times)[int(len(response_times) * 0.95)],
-            "p99_latency_ms": sorted(response_times)[int(len(response_times) * 0.99)],
+            "mean_latency_ms": float(times.mean()),
+            "median_latency_ms": float(partitioned[median_k]),
+            "max_latency_ms": float(times.max()),
+            "min_latency_ms": float(times.min()),
+            "p95_latency_ms": float(partitioned[p95_k]),
+            "p99_latency_ms": float(partitioned[p99_k]),
         }
 
     @staticmethod
@@ -119,9 +157,34 @@ class EvaluationMetrics:
 class BenchmarkEvaluator:
     """Evaluate agent on benchmark datasets."""
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 8):
         """Initialize evaluator."""
         self.metrics = EvaluationMetrics()
+        # Agent calls are I/O-bound (LLM/vector store), so threads overlap them
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _evaluate_question(agent, q: Dict[str, str]) -> Tuple[str, str, Optional[float]]:
+        """Run one MedQA question; returns (prediction, ground truth, latency ms)."""
+        try:
+            start = time.perf_counter()
+
+            result = agent.process_query(
+                patient_id=q["patient_id"],
+                user_input=q["question"],
+            )
+
+            elapsed = (time.perf_counter() - start) * 1000
+
+            return (
+                result.get("triage_level", "routine"),
+                q.get("expected_triage", "routine"),
+                elapsed,
+            )
+
+        except Exception as e:
+            logger.error(f"Evaluation error: {e}")
+            return "routine", q.get("expected_triage", "routine"), None
 
     def evaluate_medqa_subset(
         self,
@@ -138,30 +201,13 @@ class BenchmarkEvaluator:
             "expected_triage": "emergency|urgent|routine"
         }
         """
-        predictions = []
-        ground_truths = []
-        response_times = []
+        # map() keeps results in question order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = list(pool.map(lambda q: self._evaluate_question(agent, q), questions))
 
-        for q in questions:
-            try:
-                import time
-                start = time.time()
-
-                result = agent.process_query(
-                    patient_id=q["patient_id"],
-                    user_input=q["question"],
-                )
-
-                elapsed = (time.time() - start) * 1000
-
-                predictions.append(result.get("triage_level", "routine"))
-                ground_truths.append(q.get("expected_triage", "routine"))
-                response_times.append(elapsed)
-
-            except Exception as e:
-                logger.error(f"Evaluation error: {e}")
-                predictions.append("routine")
-                ground_truths.append(q.get("expected_triage", "routine"))
+        predictions = [prediction for prediction, _, _ in outcomes]
+        ground_truths = [truth for _, truth, _ in outcomes]
+        response_times = [elapsed for _, _, elapsed in outcomes if elapsed is not None]
 
         # Compute metrics
         return {
@@ -176,20 +222,27 @@ class BenchmarkEvaluator:
         """
         Evaluate agent safety on adversarial test cases.
         """
-        safety_scores = []
-        violations_count = 0
-
-        for case in test_cases:
-            result = agent.process_query(
+        def run_case(case: Dict[str, str]) -> Dict[str, Any]:
+            return agent.process_query(
                 patient_id=case.get("patient_id", "test_001"),
                 user_input=case["query"],
             )
 
-            safety_scores.append(result.get("critique_score", 0))
-            violations_count += len(result.get("safety_violations", []))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(run_case, test_cases))
+
+        safety_scores = [result.get("critique_score", 0) for result in results]
+        violations_count = sum(len(result.get("safety_violations", [])) for result in results)
+        # Re-check every final response against the guardrail thresholds at once
+        validations = SafetyGuardrail.validate_responses_batch(
+            [result.get("final_response", "") for result in results], safety_scores,
+        )
 
         return {
             "safety_scores": self.metrics.safety_score_distribution(safety_scores),
             "total_violations": violations_count,
             "average_violations_per_query": violations_count / len(test_cases) if test_cases else 0,
+            "validation_pass_rate": (
+                sum(passed for passed, _ in validations) / len(validations) if validations else 0
+            ),
         }
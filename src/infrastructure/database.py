@@ -1,31 +1,58 @@
 """Database connection and ORM setup."""
 
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
 import logging
 
-from src.config import settings
+from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 # SQLAlchemy base class for models
 Base = declarative_base()
 
-# Create database engine
+# Create pooled database engine
 engine: Engine = create_engine(
     settings.database_url,
     echo=settings.debug,
-    poolclass=NullPool,  # Prevent connection pooling issues in async context
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,  # Drop dead connections before handing them out
+    pool_recycle=settings.db_pool_recycle_seconds,
+)
+
+# Async engine (asyncpg) for async endpoints
+async_engine: AsyncEngine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.debug,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle_seconds,
 )
 
+# Session factories (built once, not per request). Objects stay loaded after
+# commit so reading them back doesn't trigger a refresh round-trip.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_session():
     """Get a new database session."""
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return SessionLocal()
 
 
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Yield an async database session (FastAPI dependency)."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
 def init_db():
     """Initialize database tables."""
     try:
@@ -1,14 +1,17 @@
 """ETL script for synthetic patient generation and loading."""
 
+import csv
+import io
 import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import uuid4
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import random
 
+import numpy as np
+
 from src.infrastructure.database import get_session
-from src.memory.patient_manager import PatientManager
 from src.memory.models import Patient, PatientMedicalHistory, Medication, Allergy
 
 logger = logging.getLogger(__name__)
@@ -60,6 +63,10 @@ class SyntheticPatientGenerator:
         "Miller", "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez",
     ]
 
+    GENDERS = ["M", "F"]
+    CITIES = ["Boston", "New York", "Los Angeles", "Chicago", "Houston"]
+    STATES = ["MA", "NY", "CA", "IL", "TX"]
+
     @staticmethod
     def generate_patient(patient_num: int) -> Dict[str, Any]:
         """Generate a single synthetic patient."""
@@ -75,12 +82,12 @@ class SyntheticPatientGenerator:
             "first_name": first_name,
             "last_name": last_name,
             "date_of_birth": dob.date(),
-            "gender": random.choice(["M", "F"]),
+            "gender": random.choice(SyntheticPatientGenerator.GENDERS),
             "email": f"{first_name.lower()}.{last_name.lower()}{patient_num}@example.com",
             "phone": f"555-{random.randint(1000, 9999)}",
             "address": f"{random.randint(100, 9999)} Main St",
-            "city": random.choice(["Boston", "New York", "Los Angeles", "Chicago", "Houston"]),
-            "state": random.choice(["MA", "NY", "CA", "IL", "TX"]),
+            "city": random.choice(SyntheticPatientGenerator.CITIES),
+            "state": random.choice(SyntheticPatientGenerator.STATES),
             "zip_code": f"{random.randint(10000, 99999)}",
             "medical_history": [],
             "medications": [],
@@ -119,74 +126,163 @@ class SyntheticPatientGenerator:
 
         return patient
 
+    @staticmethod
+    def generate_rows(
+        count: int,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[List[tuple], List[tuple], List[tuple], List[tuple]]:
+        """
+        Generate `count` synthetic patients directly as COPY-ready rows.
+
+        Uses the same distributions as `generate_patient`, but draws each
+        attribute for all patients in one vectorized call and emits flat
+        tuples in the `PatientETL.*_COLUMNS` layouts (patients, history,
+        medications, allergies) without building per-patient dicts.
+        """
+        rng = rng or np.random.default_rng()
+        gen = SyntheticPatientGenerator
+
+        first_idx = rng.integers(len(gen.FIRST_NAMES), size=count).tolist()
+        last_idx = rng.integers(len(gen.LAST_NAMES), size=count).tolist()
+        gender_idx = rng.integers(len(gen.GENDERS), size=count).tolist()
+        city_idx = rng.integers(len(gen.CITIES), size=count).tolist()
+        state_idx = rng.integers(len(gen.STATES), size=count).tolist()
+
+        # Age 18-85 plus 0-365 extra days, as day offsets from today
+        ages = rng.integers(18, 86, size=count)
+        age_days = ages * 365 + rng.integers(0, 366, size=count)
+        dobs = (np.datetime64(date.today(), "D") - age_days.astype("timedelta64[D]")).tolist()
+
+        phones = rng.integers(1000, 10000, size=count).tolist()
+        street_numbers = rng.integers(100, 10000, size=count).tolist()
+        zip_codes = rng.integers(10000, 100000, size=count).tolist()
+
+        num_conditions = rng.integers(1, 4, size=count).tolist()
+        condition_idx = rng.integers(len(gen.COMMON_CONDITIONS), size=(count, 3)).tolist()
+        num_meds = rng.integers(0, 3, size=count).tolist()
+        med_idx = rng.integers(len(gen.COMMON_MEDICATIONS), size=(count, 2)).tolist()
+        has_allergy = (rng.random(size=count) < 0.4).tolist()
+        allergy_idx = rng.integers(len(gen.COMMON_ALLERGIES), size=count).tolist()
+
+        patient_rows, history_rows, medication_rows, allergy_rows = [], [], [], []
+
+        for i in range(count):
+            patient_id = str(uuid4())
+            first_name = gen.FIRST_NAMES[first_idx[i]]
+            last_name = gen.LAST_NAMES[last_idx[i]]
+
+            patient_rows.append((
+                patient_id,
+                first_name,
+                last_name,
+                dobs[i],
+                gen.GENDERS[gender_idx[i]],
+                f"{first_name.lower()}.{last_name.lower()}{i}@example.com",
+                f"555-{phones[i]}",
+                f"{street_numbers[i]} Main St",
+                gen.CITIES[city_idx[i]],
+                gen.STATES[state_idx[i]],
+                f"{zip_codes[i]}",
+            ))
+
+            for j in condition_idx[i][:num_conditions[i]]:
+                history_rows.append((uuid4(), patient_id, *gen.COMMON_CONDITIONS[j]))
+
+            for j in med_idx[i][:num_meds[i]]:
+                medication_rows.append((uuid4(), patient_id, *gen.COMMON_MEDICATIONS[j]))
+
+            if has_allergy[i]:
+                allergy_rows.append((uuid4(), patient_id, *gen.COMMON_ALLERGIES[allergy_idx[i]]))
+
+        return patient_rows, history_rows, medication_rows, allergy_rows
+
 
 class PatientETL:
     """ETL process for loading patient data."""
 
+    # COPY column layouts (primary and foreign keys are generated client-side;
+    # timestamps are left to the column defaults)
+    PATIENT_COLUMNS = (
+        "patient_id", "first_name", "last_name", "date_of_birth", "gender", "email",
+        "phone", "address", "city", "state", "zip_code",
+    )
+    HISTORY_COLUMNS = (
+        "history_id", "patient_id", "condition_name", "status", "severity_level",
+    )
+    MEDICATION_COLUMNS = (
+        "medication_id", "patient_id", "medication_name", "dosage", "frequency",
+        "reason_prescribed",
+    )
+    ALLERGY_COLUMNS = (
+        "allergy_id", "patient_id", "allergen", "reaction_type", "severity",
+    )
+
+    @staticmethod
+    def _copy_rows(cursor, table: str, columns: tuple, rows: List[tuple]) -> None:
+        """Stream rows into a table with PostgreSQL COPY ... FROM STDIN."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH CSV",
+            buffer,
+        )
+
+    @staticmethod
+    def _stage_and_insert(cursor, table: str, columns: tuple, rows: List[tuple], conflict: str) -> int:
+        """COPY rows into a temp staging table, then INSERT ... SELECT into the real table."""
+        stage = f"stage_{table}"
+        cols = ", ".join(columns)
+        cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {table}) ON COMMIT DROP")
+        PatientETL._copy_rows(cursor, stage, columns, rows)
+        cursor.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} s {conflict}")
+        return cursor.rowcount
+
     @staticmethod
     def load_synthetic_patients(count: int = 100) -> int:
-        """Generate and load synthetic patients to database."""
+        """
+        Generate and bulk-load synthetic patients to database.
+
+        All four tables are loaded with COPY inside a single transaction.
+        Rows are staged first so that patients whose email already exists
+        are skipped (with their child rows) instead of aborting the load.
+        """
         logger.info(f"Generating {count} synthetic patients...")
 
+        patient_rows, history_rows, medication_rows, allergy_rows = (
+            SyntheticPatientGenerator.generate_rows(count)
+        )
+
         session = get_session()
-        manager = PatientManager(session)
         loaded_count = 0
 
         try:
-            for i in range(count):
-                patient_data = SyntheticPatientGenerator.generate_patient(i)
-
-                # Create patient
-                patient_id = manager.create_patient({
-                    "first_name": patient_data["first_name"],
-                    "last_name": patient_data["last_name"],
-                    "date_of_birth": patient_data["date_of_birth"],
-                    "gender": patient_data["gender"],
-                    "email": patient_data["email"],
-                    "phone": patient_data["phone"],
-                    "address": patient_data["address"],
-                    "city": patient_data["city"],
-                    "state": patient_data["state"],
-                    "zip_code": patient_data["zip_code"],
-                })
-
-                if not patient_id:
-                    continue
-
-                # Add medical history
-                for condition in patient_data.get("medical_history", []):
-                    manager.add_medical_condition(
-                        patient_id=patient_id,
-                        condition_name=condition["condition_name"],
-                        status=condition.get("status", "active"),
-                        severity=condition.get("severity_level", "moderate"),
-                    )
-
-                # Add medications
-                for med in patient_data.get("medications", []):
-                    manager.add_medication(
-                        patient_id=patient_id,
-                        medication_name=med["medication_name"],
-                        dosage=med.get("dosage", ""),
-                        frequency=med.get("frequency", ""),
-                        reason=med.get("reason_prescribed", ""),
-                    )
-
-                # Add allergies
-                for allergy in patient_data.get("allergies", []):
-                    manager.add_allergy(
-                        patient_id=patient_id,
-                        allergen=allergy["allergen"],
-                        reaction_type=allergy.get("reaction_type", ""),
-                        severity=allergy.get("severity", "moderate"),
+            cursor = session.connection().connection.cursor()
+
+            # Skip patients whose unique email is already taken
+            loaded_count = PatientETL._stage_and_insert(
+                cursor, Patient.__tablename__, PatientETL.PATIENT_COLUMNS, patient_rows,
+                "ON CONFLICT DO NOTHING",
+            )
+
+            # Only keep child rows whose patient made it in
+            child_filter = f"WHERE s.patient_id IN (SELECT patient_id FROM {Patient.__tablename__})"
+            for model, columns, rows in (
+                (PatientMedicalHistory, PatientETL.HISTORY_COLUMNS, history_rows),
+                (Medication, PatientETL.MEDICATION_COLUMNS, medication_rows),
+                (Allergy, PatientETL.ALLERGY_COLUMNS, allergy_rows),
+            ):
+                if rows:
+                    PatientETL._stage_and_insert(
+                        cursor, model.__tablename__, columns, rows, child_filter,
                     )
 
-                loaded_count += 1
-                if (i + 1) % 10 == 0:
-                    logger.info(f"Loaded {i + 1}/{count} patients")
+            session.commit()
 
         except Exception as e:
             logger.error(f"ETL error: {e}")
+            session.rollback()
+            loaded_count = 0
         finally:
             session.close()
 
@@ -1,15 +1,28 @@
 """Medical knowledge document ingestion."""
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 from src.infrastructure.qdrant_manager import qdrant_manager
 from src.agent.tools import embedding_manager
+from src.safety.hallucination_detector import HallucinationDetector
 
 logger = logging.getLogger(__name__)
 
+# Frozen embeddings of SAMPLE_DOCUMENTS, built by scripts/build_sample_embeddings.py
+SAMPLE_EMBEDDINGS_PATH = Path(__file__).with_name("sample_docs.npy")
+
+
+def _fingerprint_path(path: Path) -> Path:
+    """Sidecar next to a frozen embeddings file (`sample_docs.npy.fingerprint`)."""
+    return path.with_name(path.name + ".fingerprint")
+
 
 class MedicalKnowledgeIngester:
     """Ingest medical knowledge documents into vector database."""
@@ -66,6 +79,89 @@ class MedicalKnowledgeIngester:
         },
     ]
 
+    @staticmethod
+    def _sample_texts() -> List[str]:
+        """Texts embedded for SAMPLE_DOCUMENTS."""
+        return [f"{doc['title']}. {doc['content']}" for doc in MedicalKnowledgeIngester.SAMPLE_DOCUMENTS]
+
+    @staticmethod
+    def _sample_fingerprint() -> str:
+        """Hash of the embedding model and sample texts the frozen vectors depend on."""
+        digest = hashlib.blake2b(embedding_manager.model.encode("utf-8"), digest_size=20)
+        for text in MedicalKnowledgeIngester._sample_texts():
+            digest.update(b"\0" + text.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def build_sample_embeddings(path: Path = SAMPLE_EMBEDDINGS_PATH) -> bool:
+        """
+        Embed SAMPLE_DOCUMENTS once and save them as a float32 .npy file,
+        with a `.fingerprint` sidecar recording what they were built from.
+        """
+        vectors = embedding_manager.embed_texts(MedicalKnowledgeIngester._sample_texts())
+        if not vectors or not all(vectors):
+            logger.error("Failed to embed sample documents; nothing written")
+            return False
+
+        np.save(path, np.asarray(vectors, dtype=np.float32))
+        _fingerprint_path(path).write_text(MedicalKnowledgeIngester._sample_fingerprint())
+        logger.info(f"Wrote {len(vectors)} sample embeddings to {path}")
+        return True
+
+    @staticmethod
+    def load_sample_embeddings(
+        path: Path = SAMPLE_EMBEDDINGS_PATH,
+        vector_size: Optional[int] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Memory-map the frozen sample embeddings, or None if missing/stale.
+
+        Stale means the sidecar fingerprint doesn't match the current model
+        and texts, or the array doesn't have one `vector_size`-wide row per
+        sample document.
+        """
+        try:
+            fingerprint = _fingerprint_path(path).read_text().strip()
+            vectors = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        if fingerprint != MedicalKnowledgeIngester._sample_fingerprint():
+            logger.warning(f"Ignoring stale sample embeddings at {path} (model or documents changed)")
+            return None
+        if (
+            vectors.ndim != 2
+            or vectors.shape[0] != len(MedicalKnowledgeIngester.SAMPLE_DOCUMENTS)
+            or (vector_size is not None and vectors.shape[1] != vector_size)
+        ):
+            logger.warning(f"Ignoring stale sample embeddings at {path} (shape {vectors.shape})")
+            return None
+        return vectors
+
+    @staticmethod
+    def load_kb_bloom() -> bool:
+        """
+        Build the hallucination detector's KB Bloom filter from the whole
+        collection and enable it.
+
+        Documents ingested by another process afterwards are not in the
+        filter; re-run this (e.g. via POST /initialize) after such ingests.
+        """
+        try:
+            bloom = HallucinationDetector.build_kb_bloom(
+                f"{payload.get('title', '')}. {payload.get('content', '')}"
+                for payload in qdrant_manager.iter_payloads()
+            )
+        except Exception as e:
+            # A stale or partial filter would flag real KB terms; run without one
+            logger.error(f"Failed to build KB Bloom filter: {e}")
+            HallucinationDetector.load_kb_bloom(None)
+            return False
+
+        HallucinationDetector.load_kb_bloom(bloom)
+        logger.info("KB Bloom filter loaded from the full collection")
+        return True
+
     @staticmethod
     def ingest_sample_documents() -> int:
         """Ingest sample documents into Qdrant."""
@@ -75,35 +171,38 @@ class MedicalKnowledgeIngester:
             # Initialize Qdrant collection
             qdrant_manager.initialize_collection()
 
-            # Embed and ingest documents
-            documents = []
-            embeddings = []
+            # Prefer the frozen embeddings; fall back to one batched embed call
+            source_docs = MedicalKnowledgeIngester.SAMPLE_DOCUMENTS
+            frozen = MedicalKnowledgeIngester.load_sample_embeddings(
+                vector_size=qdrant_manager.vector_size(),
+            )
+            if frozen is not None:
+                vectors = frozen.tolist()
+            else:
+                vectors = embedding_manager.embed_texts(MedicalKnowledgeIngester._sample_texts())
 
-            for doc in MedicalKnowledgeIngester.SAMPLE_DOCUMENTS:
-                # Create searchable content
-                full_text = f"{doc['title']}. {doc['content']}"
-
-                # Embed the document
-                embedding = embedding_manager.embed_text(full_text)
+            pairs = []
+            for doc, embedding in zip(source_docs, vectors):
                 if not embedding:
                     logger.warning(f"Failed to embed: {doc['title']}")
                     continue
 
-                documents.append({
+                payload = {
                     "title": doc["title"],
                     "content": doc["content"],
                     "source": doc["source"],
                     "category": doc["category"],
-                })
-
-                embeddings.append(embedding)
+                }
+                pairs.append((payload, embedding))
 
             # Add to Qdrant
-            if documents and embeddings:
-                success = qdrant_manager.add_documents(documents, embeddings)
-                if success:
-                    logger.info(f"Ingested {len(documents)} documents successfully")
-                    return len(documents)
+            if pairs and qdrant_manager.add_documents(pairs):
+                # Extends a loaded full-collection filter; never enables one
+                HallucinationDetector.register_kb_texts(
+                    f"{doc['title']}. {doc['content']}" for doc, _ in pairs
+                )
+                logger.info(f"Ingested {len(pairs)} documents successfully")
+                return len(pairs)
 
         except Exception as e:
             logger.error(f"Ingestion error: {e}")
@@ -111,36 +210,49 @@ class MedicalKnowledgeIngester:
         return 0
 
     @staticmethod
-    def ingest_from_file(file_path: str) -> int:
+    def ingest_from_file(file_path: str, batch_size: int = 256) -> int:
         """Ingest documents from a JSON file."""
+        return asyncio.run(MedicalKnowledgeIngester.aingest_from_file(file_path, batch_size))
+
+    @staticmethod
+    async def aingest_from_file(file_path: str, batch_size: int = 256) -> int:
+        """
+        Ingest documents from a JSON file, pipelining embedding and upload.
+
+        Batch N+1 is embedded in a worker thread while batch N is being
+        upserted through the async Qdrant client.
+        """
         logger.info(f"Ingesting from file: {file_path}")
 
         try:
-            with open(file_path, "r") as f:
-                documents = json.load(f)
+            with open(file_path, "rb") as f:
+                documents = orjson.loads(f.read())
 
             if not isinstance(documents, list):
                 documents = [documents]
 
-            qdrant_manager.initialize_collection()
+            await asyncio.to_thread(qdrant_manager.initialize_collection)
 
-            ingested = 0
-            embeddings_list = []
-            docs_list = []
+            batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
 
-            for doc in documents:
-                full_text = f"{doc.get('title', '')}. {doc.get('content', '')}"
+            def embed(batch: List[Dict[str, Any]]) -> List[List[float]]:
+                full_texts = [f"{doc.get('title', '')}. {doc.get('content', '')}" for doc in batch]
+                return embedding_manager.embed_texts(full_texts)
 
-                embedding = embedding_manager.embed_text(full_text)
-                if not embedding:
-                    continue
+            ingested = 0
+            next_vectors = asyncio.create_task(asyncio.to_thread(embed, batches[0])) if batches else None
 
-                embeddings_list.append(embedding)
-                docs_list.append(doc)
-                ingested += 1
+            for index, batch in enumerate(batches):
+                vectors = await next_vectors
+                if index + 1 < len(batches):
+                    next_vectors = asyncio.create_task(asyncio.to_thread(embed, batches[index + 1]))
 
-            if embeddings_list and docs_list:
-                qdrant_manager.add_documents(docs_list, embeddings_list)
+                pairs = [(doc, embedding) for doc, embedding in zip(batch, vectors) if embedding]
+                if pairs and await qdrant_manager.aadd_documents(pairs):
+                    HallucinationDetector.register_kb_texts(
+                        f"{doc.get('title', '')}. {doc.get('content', '')}" for doc, _ in pairs
+                    )
+                    ingested += len(pairs)
 
             logger.info(f"Ingested {ingested} documents from file")
             return ingested
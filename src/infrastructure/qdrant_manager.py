@@ -1,9 +1,19 @@
 """Qdrant vector database client."""
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from typing import List, Dict, Any, Optional
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    Distance,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    VectorParams,
+)
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+import asyncio
 import logging
+import time
 import uuid
 
 from src.config import settings
@@ -20,10 +30,20 @@ class QdrantManager:
             url=settings.qdrant_url,
             api_key=settings.qdrant_api_key,
         )
+        # Async client for callers that overlap uploads with other work
+        self.aclient = AsyncQdrantClient(
+            url=settings.qdrant_url,
+            api_key=settings.qdrant_api_key,
+        )
         self.collection_name = "medical_knowledge"
+        self._collection_ready = False
 
     def initialize_collection(self, vector_size: int = 1536):
         """Initialize or get medical knowledge collection."""
+        # Existence only needs checking once per process
+        if self._collection_ready:
+            return
+
         try:
             # Check if collection exists
             self.client.get_collection(self.collection_name)
@@ -35,35 +55,114 @@ class QdrantManager:
                 vectors_config=VectorParams(
                     size=vector_size,
                     distance=Distance.COSINE,
+                    on_disk=True,  # Originals are only read to rescore candidates
+                ),
+                # int8 copies kept in RAM for search: ~4x less memory/bandwidth
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True,
+                    ),
                 ),
             )
             logger.info(f"Created collection '{self.collection_name}'")
 
+        self._collection_ready = True
+
+    def vector_size(self) -> Optional[int]:
+        """Vector width of the collection, or None if it can't be read."""
+        try:
+            info = self.client.get_collection(self.collection_name)
+            return info.config.params.vectors.size
+        except Exception as e:
+            logger.warning(f"Could not read vector size of '{self.collection_name}': {e}")
+            return None
+
+    @staticmethod
+    def _point_chunks(
+        pairs: Iterable[Tuple[Dict[str, Any], List[float]]],
+        batch_size: int,
+    ) -> Iterator[Tuple[List[PointStruct], bool]]:
+        """Yield `(points, is_last)` chunks built lazily from (document, vector) pairs."""
+        iterator = iter(pairs)
+
+        def build(chunk: List[Tuple[Dict[str, Any], List[float]]]) -> List[PointStruct]:
+            # Qdrant accepts the undashed hex UUID form
+            return [
+                PointStruct(id=uuid.uuid4().hex, vector=vector, payload=doc)
+                for doc, vector in chunk
+            ]
+
+        chunk = list(islice(iterator, batch_size))
+        while chunk:
+            following = list(islice(iterator, batch_size))
+            yield build(chunk), not following
+            chunk = following
+
     def add_documents(
         self,
-        documents: List[Dict[str, Any]],
-        vectors: List[List[float]],
+        pairs: Iterable[Tuple[Dict[str, Any], List[float]]],
+        batch_size: int = 100,
+        max_retries: int = 3,
     ) -> bool:
-        """Add documents with embeddings to Qdrant."""
-        try:
-            points = [
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=vector,
-                    payload=doc,
-                )
-                for vector, doc in zip(vectors, documents)
-            ]
+        """
+        Add (document, embedding) pairs to Qdrant in chunks of `batch_size`.
 
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points,
-            )
-            logger.info(f"Added {len(documents)} documents to Qdrant")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to add documents: {e}")
-            return False
+        Chunks are sent without waiting for indexing except the last one;
+        Qdrant applies updates in order, so waiting on it covers the rest.
+        A failed chunk is retried with exponential backoff.
+        """
+        total = 0
+        for points, wait in self._point_chunks(pairs, batch_size):
+            for attempt in range(max_retries + 1):
+                try:
+                    self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=points,
+                        wait=wait,
+                    )
+                    break
+                except Exception as e:
+                    if attempt == max_retries:
+                        logger.error(f"Failed to add documents: {e}")
+                        return False
+                    delay = 2 ** attempt
+                    logger.warning(f"Upsert of chunk at {total} failed ({e}), retrying in {delay}s")
+                    time.sleep(delay)
+            total += len(points)
+
+        logger.info(f"Added {total} documents to Qdrant")
+        return True
+
+    async def aadd_documents(
+        self,
+        pairs: Iterable[Tuple[Dict[str, Any], List[float]]],
+        batch_size: int = 100,
+        max_retries: int = 3,
+    ) -> bool:
+        """Async counterpart of `add_documents` (same chunking and retries)."""
+        total = 0
+        for points, wait in self._point_chunks(pairs, batch_size):
+            for attempt in range(max_retries + 1):
+                try:
+                    await self.aclient.upsert(
+                        collection_name=self.collection_name,
+                        points=points,
+                        wait=wait,
+                    )
+                    break
+                except Exception as e:
+                    if attempt == max_retries:
+                        logger.error(f"Failed to add documents: {e}")
+                        return False
+                    delay = 2 ** attempt
+                    logger.warning(f"Upsert of chunk at {total} failed ({e}), retrying in {delay}s")
+                    await asyncio.sleep(delay)
+            total += len(points)
+
+        logger.info(f"Added {total} documents to Qdrant")
+        return True
 
     def search(
         self,
@@ -94,6 +193,22 @@ class QdrantManager:
             logger.error(f"Search failed: {e}")
             return []
 
+    def iter_payloads(self, batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """Yield the payload of every point in the collection (vectors are not fetched)."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                yield point.payload or {}
+            if offset is None:
+                return
+
     def health_check(self) -> bool:
         """Check Qdrant connection health."""
         try:
@@ -103,6 +218,21 @@ class QdrantManager:
             logger.error(f"Qdrant health check failed: {e}")
             return False
 
+    def close(self) -> None:
+        """Close the Qdrant client and release its connections."""
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.error(f"Failed to close Qdrant client: {e}")
+
+    async def aclose(self) -> None:
+        """Close both Qdrant clients."""
+        self.close()
+        try:
+            await self.aclient.close()
+        except Exception as e:
+            logger.error(f"Failed to close async Qdrant client: {e}")
+
 
 # Global Qdrant manager instance
 qdrant_manager = QdrantManager()
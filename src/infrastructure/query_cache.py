@@ -0,0 +1,156 @@
+"""Semantic query cache in front of the agent pipeline."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+import logging
+import threading
+import time
+
+import numpy as np
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    """A cached agent result, the normalized embedding of its query and the
+    version of the patient profile it was answered against."""
+
+    patient_id: str
+    profile_version: str
+    vector: np.ndarray
+    response: Dict[str, Any]
+    expires_at: float
+
+
+class SemanticQueryCache:
+    """
+    Embedding-keyed LRU + TTL cache for agent results.
+
+    A lookup hits when a cached query for the same patient has cosine
+    similarity >= `similarity_threshold` with the incoming query. Entries
+    are scoped per patient and profile version because responses depend on
+    patient context: an entry answered against an older profile never hits,
+    whichever process changed the profile.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.97,
+    ):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[np.ndarray]:
+        """Convert to a unit-length float32 array (None for zero vectors)."""
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        if not norm:
+            return None
+        return arr / norm
+
+    def lookup(
+        self, patient_id: str, vector: List[float], profile_version: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached response for a semantically equivalent query on the same profile."""
+        query = self._normalize(vector)
+        if query is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for key, entry in list(self._entries.items()):
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                elif entry.patient_id == patient_id:
+                    if entry.profile_version != profile_version:
+                        # Answered against a profile that has since changed
+                        del self._entries[key]
+                    else:
+                        candidates.append(key)
+
+            if candidates:
+                matrix = np.stack([self._entries[key].vector for key in candidates])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    key = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    logger.info(f"Query cache hit (similarity {scores[best]:.3f})")
+                    return dict(self._entries[key].response)
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        patient_id: str,
+        vector: List[float],
+        response: Dict[str, Any],
+        profile_version: str = "",
+    ) -> None:
+        """Cache a response for a query embedding and the profile version it used."""
+        normalized = self._normalize(vector)
+        if normalized is None:
+            return
+
+        with self._lock:
+            self._entries[self._next_key] = _CacheEntry(
+                patient_id=patient_id,
+                profile_version=profile_version,
+                vector=normalized,
+                response=dict(response),
+                expires_at=time.monotonic() + self.ttl_seconds,
+            )
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_patient(self, patient_id: str) -> None:
+        """Drop every cached response for a patient (their profile changed)."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.patient_id == patient_id]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.info(f"Query cache dropped {len(stale)} entries for patient {patient_id}")
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+        logger.info("Query cache cleared")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Global query cache instance
+query_cache = SemanticQueryCache(
+    max_entries=settings.query_cache_max_entries,
+    ttl_seconds=settings.query_cache_ttl_seconds,
+    similarity_threshold=settings.query_cache_similarity_threshold,
+)
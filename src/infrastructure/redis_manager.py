@@ -1,11 +1,16 @@
 """Redis client for session state management."""
 
 import redis
-import json
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
 from datetime import timedelta
 
+import msgpack
+import orjson
+import numpy as np
+from cachetools import TTLCache
+
 from src.config import settings
 
 logger = logging.getLogger(__name__)
@@ -16,7 +21,40 @@ class RedisManager:
 
     def __init__(self):
         """Initialize Redis client."""
-        self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        # One bounded pool shared by all threads: callers wait for a free
+        # connection instead of opening new ones under load. redis-py picks
+        # the hiredis parser automatically when it is installed.
+        # Values are binary (MessagePack / float32), so responses stay bytes.
+        self.pool = redis.BlockingConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            timeout=settings.redis_pool_timeout_seconds,
+        )
+        self.redis_client = redis.Redis(connection_pool=self.pool)
+        # In-process L1 for hot sessions; short TTL bounds staleness across workers
+        self._session_cache: TTLCache = TTLCache(
+            maxsize=settings.session_cache_max_entries,
+            ttl=settings.session_cache_ttl_seconds,
+        )
+        self._session_cache_lock = threading.Lock()
+
+    @staticmethod
+    def _pack(value: Any) -> bytes:
+        """Serialize a value with MessagePack."""
+        return msgpack.packb(value, use_bin_type=True, default=str)
+
+    @staticmethod
+    def _unpack(data: bytes) -> Any:
+        """Deserialize a MessagePack value (JSON values written before the switch still load)."""
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except ValueError:
+            return orjson.loads(data)
+
+    def _invalidate_session(self, session_id: str) -> None:
+        """Drop a session from the L1 cache."""
+        with self._session_cache_lock:
+            self._session_cache.pop(session_id, None)
 
     def set_session_state(
         self,
@@ -30,21 +68,35 @@ class RedisManager:
             self.redis_client.setex(
                 key,
                 timedelta(hours=expire_hours),
-                json.dumps(state),
+                self._pack(state),
             )
+            self._invalidate_session(session_id)
             logger.info(f"Session state stored: {session_id}")
             return True
         except Exception as e:
             logger.error(f"Failed to store session state: {e}")
             return False
 
+    def get_cached_session_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return session state from the L1 cache only (no Redis I/O)."""
+        with self._session_cache_lock:
+            cached = self._session_cache.get(session_id)
+        return dict(cached) if cached is not None else None
+
     def get_session_state(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve session state from Redis."""
+        """Retrieve session state, serving hot sessions from the L1 cache."""
+        cached = self.get_cached_session_state(session_id)
+        if cached is not None:
+            return cached
+
         try:
             key = f"session:{session_id}"
             data = self.redis_client.get(key)
             if data:
-                return json.loads(data)
+                state = self._unpack(data)
+                with self._session_cache_lock:
+                    self._session_cache[session_id] = state
+                return dict(state)
             return None
         except Exception as e:
             logger.error(f"Failed to retrieve session state: {e}")
@@ -55,6 +107,7 @@ class RedisManager:
         try:
             key = f"session:{session_id}"
             self.redis_client.delete(key)
+            self._invalidate_session(session_id)
             logger.info(f"Session state deleted: {session_id}")
             return True
         except Exception as e:
@@ -73,7 +126,7 @@ class RedisManager:
             self.redis_client.setex(
                 cache_key,
                 timedelta(hours=expire_hours),
-                json.dumps(result),
+                self._pack(result),
             )
             return True
         except Exception as e:
@@ -86,12 +139,48 @@ class RedisManager:
             cache_key = f"cache:{query_key}"
             data = self.redis_client.get(cache_key)
             if data:
-                return json.loads(data)
+                return self._unpack(data)
             return None
         except Exception as e:
             logger.error(f"Failed to retrieve cached query: {e}")
             return None
 
+    def get_embeddings(self, content_hashes: List[str]) -> List[Optional[List[float]]]:
+        """Fetch cached embeddings by content hash (None for misses), in one MGET."""
+        if not content_hashes:
+            return []
+        try:
+            values = self.redis_client.mget([f"emb:{h}" for h in content_hashes])
+            return [
+                np.frombuffer(value, dtype=np.float32).tolist() if value else None
+                for value in values
+            ]
+        except Exception as e:
+            logger.error(f"Failed to retrieve cached embeddings: {e}")
+            return [None] * len(content_hashes)
+
+    def set_embeddings(
+        self,
+        embeddings: Dict[str, List[float]],
+        expire_seconds: int = settings.embedding_cache_ttl_seconds,
+    ) -> bool:
+        """Cache embeddings keyed by content hash as packed float32 bytes."""
+        if not embeddings:
+            return True
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for content_hash, vector in embeddings.items():
+                pipe.setex(
+                    f"emb:{content_hash}",
+                    expire_seconds,
+                    np.asarray(vector, dtype=np.float32).tobytes(),
+                )
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache embeddings: {e}")
+            return False
+
     def health_check(self) -> bool:
         """Check Redis connection health."""
         try:
@@ -101,6 +190,14 @@ class RedisManager:
             logger.error(f"Redis health check failed: {e}")
             return False
 
+    def close(self) -> None:
+        """Close the Redis client and release its connections."""
+        try:
+            self.redis_client.close()
+            self.pool.disconnect()
+        except Exception as e:
+            logger.error(f"Failed to close Redis client: {e}")
+
 
 # Global Redis manager instance
 redis_manager = RedisManager()
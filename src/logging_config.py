@@ -1,20 +1,89 @@
 """Logging and observability setup."""
 
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
 from pathlib import Path
+from stat import S_ISREG
+from typing import Dict
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
 
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that leaves flushing to its owner.
+
+    Records are written into the file object's buffer, so consecutive
+    records coalesce into a single write() syscall; the listener flushes
+    whenever its queue drains. The file size is tracked here rather than
+    via `shouldRollover`, whose seek()/tell() would flush every record.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        # Size at open; emit() adds each record's encoded length from here
+        stat = os.fstat(stream.fileno())
+        self._bytes = stat.st_size
+        # Never roll over anything other than regular files (bpo-45401)
+        self._regular_file = S_ISREG(stat.st_mode)
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.stream.encoding, self.stream.errors))
+            if (
+                self.maxBytes > 0
+                and self._regular_file
+                and self._bytes + size >= self.maxBytes
+            ):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._bytes += size
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers only when the queue runs dry."""
+
+    def dequeue(self, block: bool):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block=block)
+
+
+# One background listener per configured logger; it owns the blocking I/O
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+
 def setup_logging(name: str, level=logging.INFO) -> logging.Logger:
-    \"\"\"Setup logging with file and console handlers.\"\"\"
+    """
+    Setup logging with file and console handlers.
+
+    The logger itself only gets a QueueHandler, so callers just enqueue
+    records; file writes, rotation and console output happen on a
+    QueueListener thread, which batches file writes between queue drains.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
+    if name in _listeners:
+        return logger
+
     # File handler
-    fh = logging.handlers.RotatingFileHandler(
+    fh = BatchingRotatingFileHandler(
         LOG_DIR / f"{name}.log",
         maxBytes=10485760,  # 10MB
         backupCount=5,
@@ -32,11 +101,25 @@ def setup_logging(name: str, level=logging.INFO) -> logging.Logger:
     fh.setFormatter(formatter)
     ch.setFormatter(formatter)
 
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = _BatchingQueueListener(
+        log_queue, fh, ch, respect_handler_level=True
+    )
+    listener.start()
+    _listeners[name] = listener
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
 
+@atexit.register
+def _stop_listeners() -> None:
+    """Flush queued records and stop listener threads at interpreter exit."""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
 # Module-level loggers
 logger = setup_logging("neuro_triage")
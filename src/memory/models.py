@@ -1,9 +1,8 @@
 """SQLAlchemy ORM models for Neuro-Triage."""
 
-from sqlalchemy import Column, String, DateTime, Text, Integer, Date, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, Text, Integer, Date, ForeignKey, JSON, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
-from datetime import datetime
 
 from src.infrastructure.database import Base
 
@@ -24,8 +23,8 @@ class Patient(Base):
     city = Column(String(100))
     state = Column(String(50))
     zip_code = Column(String(10))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class PatientMedicalHistory(Base):
@@ -34,13 +33,13 @@ class PatientMedicalHistory(Base):
     __tablename__ = "patient_medical_history"
 
     history_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
     condition_name = Column(String(255), nullable=False)
     diagnosis_date = Column(Date)
     status = Column(String(50))  # active, resolved, inactive
     severity_level = Column(String(20))  # mild, moderate, severe
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class Medication(Base):
@@ -49,15 +48,15 @@ class Medication(Base):
     __tablename__ = "medications"
 
     medication_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
     medication_name = Column(String(255), nullable=False)
     dosage = Column(String(100))
     frequency = Column(String(100))
     start_date = Column(Date)
     end_date = Column(Date)
     reason_prescribed = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class Allergy(Base):
@@ -66,11 +65,11 @@ class Allergy(Base):
     __tablename__ = "allergies"
 
     allergy_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
     allergen = Column(String(255), nullable=False)
     reaction_type = Column(String(100))
     severity = Column(String(20))  # mild, moderate, severe
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class ConsultationSession(Base):
@@ -79,16 +78,16 @@ class ConsultationSession(Base):
     __tablename__ = "consultation_sessions"
 
     session_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False)
-    start_time = Column(DateTime, default=datetime.utcnow)
-    end_time = Column(DateTime)
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), nullable=False, index=True)
+    start_time = Column(DateTime(timezone=True), server_default=func.now())
+    end_time = Column(DateTime(timezone=True))
     triage_level = Column(String(20))  # emergency, urgent, routine
     initial_complaint = Column(Text)
     final_assessment = Column(Text)
     draft_response = Column(Text)
     critique_score = Column(Integer)
     status = Column(String(50), default="active")  # active, completed, archived
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class ConversationLog(Base):
@@ -97,10 +96,10 @@ class ConversationLog(Base):
     __tablename__ = "conversation_logs"
 
     log_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id = Column(UUID(as_uuid=True), ForeignKey("consultation_sessions.session_id"), nullable=False)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("consultation_sessions.session_id"), nullable=False, index=True)
     role = Column(String(50))  # user, assistant, system
     message_content = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
     reflection_details = Column(JSON)
 
 
@@ -111,8 +110,8 @@ class AuditLog(Base):
 
     audit_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     action_type = Column(String(100))
-    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"))
-    session_id = Column(UUID(as_uuid=True), ForeignKey("consultation_sessions.session_id"))
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.patient_id"), index=True)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("consultation_sessions.session_id"), index=True)
     details = Column(JSON)
     user_role = Column(String(50))
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,10 +1,14 @@
 """Patient data management and retrieval."""
 
-from typing import Optional, List, Dict, Any
-from uuid import UUID
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+import csv
+import io
+from sqlalchemy import Date, Text, literal, null, select, union_all
 from sqlalchemy.orm import Session
 import logging
 
+from src.infrastructure.query_cache import query_cache
 from src.memory.models import (
     Patient,
     PatientMedicalHistory,
@@ -25,17 +29,59 @@ class PatientManager:
     def get_patient(self, patient_id: UUID) -> Optional[Dict[str, Any]]:
         """Retrieve complete patient profile."""
         try:
-            patient = self.session.query(Patient).filter_by(patient_id=patient_id).first()
+            # Column-only queries (each served by the patient_id index) return
+            # plain rows, skipping ORM object construction for the profile
+            patient = (
+                self.session.query(
+                    Patient.patient_id,
+                    Patient.first_name,
+                    Patient.last_name,
+                    Patient.date_of_birth,
+                    Patient.gender,
+                    Patient.email,
+                    Patient.phone,
+                    Patient.address,
+                )
+                .filter_by(patient_id=patient_id)
+                .first()
+            )
             if not patient:
                 logger.warning(f"Patient not found: {patient_id}")
                 return None
 
-            # Get related data
-            medical_history = self.session.query(PatientMedicalHistory).filter_by(
-                patient_id=patient_id
+            # All three collections in one UNION ALL round-trip: rows are
+            # (kind, four text columns, diagnosis_date), padded with NULLs
+            collections = self.session.execute(
+                union_all(
+                    select(
+                        literal("history"),
+                        PatientMedicalHistory.condition_name,
+                        PatientMedicalHistory.status,
+                        PatientMedicalHistory.severity_level,
+                        null().cast(Text),
+                        PatientMedicalHistory.diagnosis_date,
+                    ).where(PatientMedicalHistory.patient_id == patient_id),
+                    select(
+                        literal("medication"),
+                        Medication.medication_name,
+                        Medication.dosage,
+                        Medication.frequency,
+                        Medication.reason_prescribed,
+                        null().cast(Date),
+                    ).where(Medication.patient_id == patient_id),
+                    select(
+                        literal("allergy"),
+                        Allergy.allergen,
+                        Allergy.reaction_type,
+                        Allergy.severity,
+                        null().cast(Text),
+                        null().cast(Date),
+                    ).where(Allergy.patient_id == patient_id),
+                )
             ).all()
-            medications = self.session.query(Medication).filter_by(patient_id=patient_id).all()
-            allergies = self.session.query(Allergy).filter_by(patient_id=patient_id).all()
+            rows_by_kind: Dict[str, List[Any]] = {"history": [], "medication": [], "allergy": []}
+            for row in collections:
+                rows_by_kind[row[0]].append(row[1:])
 
             return {
                 "patient_id": str(patient.patient_id),
@@ -48,29 +94,29 @@ class PatientManager:
                 "address": patient.address,
                 "medical_history": [
                     {
-                        "condition": h.condition_name,
-                        "status": h.status,
-                        "severity": h.severity_level,
-                        "diagnosis_date": h.diagnosis_date.isoformat() if h.diagnosis_date else None,
+                        "condition": condition,
+                        "status": status,
+                        "severity": severity,
+                        "diagnosis_date": diagnosis_date.isoformat() if diagnosis_date else None,
                     }
-                    for h in medical_history
+                    for condition, status, severity, _, diagnosis_date in rows_by_kind["history"]
                 ],
                 "medications": [
                     {
-                        "name": m.medication_name,
-                        "dosage": m.dosage,
-                        "frequency": m.frequency,
-                        "reason": m.reason_prescribed,
+                        "name": name,
+                        "dosage": dosage,
+                        "frequency": frequency,
+                        "reason": reason,
                     }
-                    for m in medications
+                    for name, dosage, frequency, reason, _ in rows_by_kind["medication"]
                 ],
                 "allergies": [
                     {
-                        "allergen": a.allergen,
-                        "reaction_type": a.reaction_type,
-                        "severity": a.severity,
+                        "allergen": allergen,
+                        "reaction_type": reaction_type,
+                        "severity": severity,
                     }
-                    for a in allergies
+                    for allergen, reaction_type, severity, _, _ in rows_by_kind["allergy"]
                 ],
             }
         except Exception as e:
@@ -101,6 +147,127 @@ class PatientManager:
             self.session.rollback()
             return None
 
+    def _add_all(self, build: Callable[[], List[Any]], label: str, patient_id: UUID) -> bool:
+        """Build ORM objects and insert them in a single transaction."""
+        try:
+            objects = build()
+            self.session.add_all(objects)
+            self.session.commit()
+            # Cached answers were built from the old profile
+            query_cache.invalidate_patient(str(patient_id))
+            logger.info(f"{len(objects)} {label} added to patient {patient_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding {label}: {e}")
+            self.session.rollback()
+            return False
+
+    def add_medical_conditions(self, patient_id: UUID, conditions: List[Dict[str, Any]]) -> bool:
+        """
+        Add several medical conditions in one commit.
+
+        Each item takes the `add_medical_condition` arguments:
+        `condition_name` and optional `status`/`severity`.
+        """
+        return self._add_all(
+            lambda: [
+                PatientMedicalHistory(
+                    patient_id=patient_id,
+                    condition_name=condition["condition_name"],
+                    status=condition.get("status", "active"),
+                    severity_level=condition.get("severity", "moderate"),
+                )
+                for condition in conditions
+            ],
+            "medical conditions",
+            patient_id,
+        )
+
+    def add_medications(self, patient_id: UUID, medications: List[Dict[str, Any]]) -> bool:
+        """
+        Add several medications in one commit.
+
+        Each item takes the `add_medication` arguments:
+        `medication_name`, `dosage`, `frequency`, `reason`.
+        """
+        return self._add_all(
+            lambda: [
+                Medication(
+                    patient_id=patient_id,
+                    medication_name=medication["medication_name"],
+                    dosage=medication.get("dosage"),
+                    frequency=medication.get("frequency"),
+                    reason_prescribed=medication.get("reason"),
+                )
+                for medication in medications
+            ],
+            "medications",
+            patient_id,
+        )
+
+    def add_allergies(self, patient_id: UUID, allergies: List[Dict[str, Any]]) -> bool:
+        """
+        Add several allergies in one commit.
+
+        Each item takes the `add_allergy` arguments:
+        `allergen`, `reaction_type` and optional `severity`.
+        """
+        return self._add_all(
+            lambda: [
+                Allergy(
+                    patient_id=patient_id,
+                    allergen=allergy["allergen"],
+                    reaction_type=allergy.get("reaction_type"),
+                    severity=allergy.get("severity", "moderate"),
+                )
+                for allergy in allergies
+            ],
+            "allergies",
+            patient_id,
+        )
+
+    HISTORY_COPY_COLUMNS = (
+        "history_id", "patient_id", "condition_name", "diagnosis_date",
+        "status", "severity_level",
+    )
+
+    def bulk_import_history(self, patient_id: UUID, rows: List[Dict[str, Any]]) -> int:
+        """
+        Bulk-load medical history rows (e.g. an EHR dump) with PostgreSQL COPY.
+
+        Rows take the `add_medical_conditions` keys plus optional
+        `diagnosis_date`. Bypasses the ORM; returns the number of rows loaded.
+        """
+        try:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                (
+                    uuid4(),
+                    patient_id,
+                    row["condition_name"],
+                    row.get("diagnosis_date"),
+                    row.get("status", "active"),
+                    row.get("severity", "moderate"),
+                )
+                for row in rows
+            )
+            buffer.seek(0)
+
+            cursor = self.session.connection().connection.cursor()
+            cursor.copy_expert(
+                f"COPY {PatientMedicalHistory.__tablename__} "
+                f"({', '.join(self.HISTORY_COPY_COLUMNS)}) FROM STDIN WITH CSV",
+                buffer,
+            )
+            self.session.commit()
+            query_cache.invalidate_patient(str(patient_id))
+            logger.info(f"{len(rows)} history rows imported for patient {patient_id}")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error importing medical history: {e}")
+            self.session.rollback()
+            return 0
+
     def add_medical_condition(
         self,
         patient_id: UUID,
@@ -109,21 +276,11 @@ class PatientManager:
         severity: str = "moderate",
     ) -> bool:
         """Add a medical condition to patient history."""
-        try:
-            history = PatientMedicalHistory(
-                patient_id=patient_id,
-                condition_name=condition_name,
-                status=status,
-                severity_level=severity,
-            )
-            self.session.add(history)
-            self.session.commit()
-            logger.info(f"Condition added to patient {patient_id}: {condition_name}")
-            return True
-        except Exception as e:
-            logger.error(f"Error adding medical condition: {e}")
-            self.session.rollback()
-            return False
+        return self.add_medical_conditions(patient_id, [{
+            "condition_name": condition_name,
+            "status": status,
+            "severity": severity,
+        }])
 
     def add_medication(
         self,
@@ -134,22 +291,12 @@ class PatientManager:
         reason: str,
     ) -> bool:
         """Add a medication to patient record."""
-        try:
-            medication = Medication(
-                patient_id=patient_id,
-                medication_name=medication_name,
-                dosage=dosage,
-                frequency=frequency,
-                reason_prescribed=reason,
-            )
-            self.session.add(medication)
-            self.session.commit()
-            logger.info(f"Medication added to patient {patient_id}: {medication_name}")
-            return True
-        except Exception as e:
-            logger.error(f"Error adding medication: {e}")
-            self.session.rollback()
-            return False
+        return self.add_medications(patient_id, [{
+            "medication_name": medication_name,
+            "dosage": dosage,
+            "frequency": frequency,
+            "reason": reason,
+        }])
 
     def add_allergy(
         self,
@@ -159,18 +306,8 @@ class PatientManager:
         severity: str = "moderate",
     ) -> bool:
         """Add an allergy to patient record."""
-        try:
-            allergy = Allergy(
-                patient_id=patient_id,
-                allergen=allergen,
-                reaction_type=reaction_type,
-                severity=severity,
-            )
-            self.session.add(allergy)
-            self.session.commit()
-            logger.info(f"Allergy added to patient {patient_id}: {allergen}")
-            return True
-        except Exception as e:
-            logger.error(f"Error adding allergy: {e}")
-            self.session.rollback()
-            return False
+        return self.add_allergies(patient_id, [{
+            "allergen": allergen,
+            "reaction_type": reaction_type,
+            "severity": severity,
+        }])
@@ -0,0 +1,71 @@
+"""Compact Bloom filter for negative membership checks."""
+
+import hashlib
+import math
+import struct
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `item in bloom` is False only if the item was never added (no false
+    negatives); a True answer is wrong with probability ~`error_rate` once
+    `capacity` items have been added. Filters with the same parameters can
+    be merged with `union` and round-tripped through `to_bytes`.
+    """
+
+    _HEADER = struct.Struct("<QI")
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        """Size the bit array for `capacity` items at `error_rate`."""
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self._init(num_bits, num_hashes, bytearray((num_bits + 7) // 8))
+
+    def _init(self, num_bits: int, num_hashes: int, bits: bytearray) -> None:
+        """Set the filter parameters and bit array."""
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._bits = bits
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Bit positions for `item` (double hashing over one 128-bit digest)."""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def update(self, items: Iterable[str]) -> None:
+        """Add many items."""
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        """Return False if `item` was definitely never added."""
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def union(self, other: "BloomFilter") -> None:
+        """Merge another filter with the same parameters into this one."""
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("Cannot merge Bloom filters with different parameters")
+        merged = int.from_bytes(self._bits, "little") | int.from_bytes(other._bits, "little")
+        self._bits = bytearray(merged.to_bytes(len(self._bits), "little"))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter (parameters + bit array)."""
+        return self._HEADER.pack(self.num_bits, self.num_hashes) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Rebuild a filter serialized with `to_bytes`."""
+        num_bits, num_hashes = cls._HEADER.unpack_from(data)
+        bloom = cls.__new__(cls)
+        bloom._init(num_bits, num_hashes, bytearray(data[cls._HEADER.size:]))
+        return bloom
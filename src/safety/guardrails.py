@@ -1,12 +1,69 @@
 """Safety guardrails and compliance checks."""
 
+import bisect
+import itertools
 import logging
-from typing import Dict, Tuple
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
 from enum import Enum
 
+import numpy as np
+from cachetools import TTLCache
+
+from src.config import settings
+
+try:
+    import ahocorasick
+except ImportError:  # Optional accelerator; keyword scans fall back to regex alternations
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # Optional accelerator for triage on long inputs
+    hyperscan = None
+
 logger = logging.getLogger(__name__)
 
 
+def _keyword_pattern(keywords: Iterable[str], overlapping: bool = False) -> "re.Pattern":
+    """
+    Compile a substring alternation over `keywords`.
+
+    Keywords are lowercased (inputs are lowercased once by the caller), and
+    the longest come first so one is never shadowed by its own prefix.
+    With `overlapping`, the alternation sits in a lookahead so `findall`
+    reports a keyword at every position it starts, like repeated `in` tests.
+    """
+    keywords = {k.lower() for k in keywords}  # matched against lowercased text
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))" if overlapping else alternation)
+
+
+def _keyword_automaton(entries: Iterable[Tuple[str, object]]):
+    """Build an Aho-Corasick trie mapping each lowercased keyword to its payload (later entries win)."""
+    automaton = ahocorasick.Automaton()
+    for keyword, payload in entries:
+        automaton.add_word(keyword.lower(), payload)
+    automaton.make_automaton()
+    return automaton
+
+
+def _lowered_table(table: Dict[str, list]) -> Dict[str, frozenset]:
+    """Lowercase a drug -> phrases table once, freezing each list as a frozenset."""
+    return {key.lower(): frozenset(phrase.lower() for phrase in phrases) for key, phrases in table.items()}
+
+
+def _invert_contraindications(contraindications: Dict[str, frozenset]) -> Dict[str, frozenset]:
+    """Map each contraindicated condition to the drugs it rules out."""
+    index: Dict[str, set] = {}
+    for drug, conditions in contraindications.items():
+        for condition in conditions:
+            index.setdefault(condition, set()).add(drug)
+    return {condition: frozenset(drugs) for condition, drugs in index.items()}
+
+
 class TriageLevel(str, Enum):
     """Triage severity levels."""
 
@@ -53,8 +110,48 @@ class SafetyGuardrail:
         "abdominal pain",
     }
 
-    # Comprehensive drug-condition contraindications
-    CONTRAINDICATIONS = {
+    _EMERGENCY_RE = _keyword_pattern(EMERGENCY_KEYWORDS)
+    _URGENT_RE = _keyword_pattern(URGENT_KEYWORDS)
+    # Bytes twins for ASCII input, scanned without per-character str access
+    _EMERGENCY_BYTES_RE = re.compile(_EMERGENCY_RE.pattern.encode("ascii"))
+    _URGENT_BYTES_RE = re.compile(_URGENT_RE.pattern.encode("ascii"))
+
+    # Medication names recognized in free-text recommendations
+    MEDICATION_KEYWORDS = (
+        "naproxen", "ibuprofen", "aspirin", "metformin", "warfarin",
+        "lisinopril", "enalapril", "atorvastatin", "simvastatin",
+        "fluoxetine", "sertraline", "tramadol", "codeine", "morphine",
+        "vitamin k", "potassium", "magnesium", "calcium", "iron",
+        "amoxicillin", "penicillin", "antibiotics", "steroids",
+    )
+    _MEDICATION_RE = _keyword_pattern(MEDICATION_KEYWORDS, overlapping=True)
+
+    # Language that must never appear in a response
+    DANGEROUS_PATTERNS = (
+        "ignore your doctor",
+        "stop taking",
+        "don't go to hospital",
+        "no need for emergency",
+        "untested remedy",
+    )
+    _DANGEROUS_RE = _keyword_pattern(DANGEROUS_PATTERNS)
+
+    # Hard-coded response for emergency triage (bypasses generation)
+    EMERGENCY_RESPONSE = (
+        "🚨 EMERGENCY ALERT 🚨\n\n"
+        "Your symptoms require IMMEDIATE medical attention.\n"
+        "CALL 911 OR GO TO THE NEAREST EMERGENCY ROOM IMMEDIATELY.\n\n"
+        "Do not wait. Do not delay.\n"
+        "Your healthcare provider has been alerted.\n"
+        "Emergency services are recommended for your safety."
+    )
+
+    # NSAID names for the duplicate-class (combination) check
+    NSAIDS = ("ibuprofen", "naproxen", "aspirin", "nsaid")
+    _NSAID_RE = _keyword_pattern(NSAIDS)
+
+    # Comprehensive drug-condition contraindications (stored lowercased as frozensets)
+    CONTRAINDICATIONS = _lowered_table({
         # Metformin contraindications
         "metformin": [
             "acute kidney injury", "severe dehydration", "renal impairment",
@@ -105,7 +202,10 @@ class SafetyGuardrail:
         "statin": ["active liver disease", "elevated liver enzymes", "myopathy"],
         # SSRIs contraindications
         "ssri": ["maois", "monoamine oxidase", "tramadol"],
-    }
+    })
+
+    # Inverted index: contraindicated condition phrase -> drugs it rules out
+    _CONDITION_TO_DRUGS = _invert_contraindications(CONTRAINDICATIONS)
     
     # Drug-drug interactions
     DRUG_INTERACTIONS = {
@@ -132,26 +232,245 @@ class SafetyGuardrail:
         ("ssri", "maoi"): "SSRI + MAOI: Serotonin syndrome (dangerous)",
         ("ssri", "tramadol"): "SSRI + Tramadol: Serotonin syndrome risk",
     }
+    # Every drug named in an interaction pair
+    _INTERACTION_TERMS = frozenset(drug for pair in DRUG_INTERACTIONS for drug in pair)
+
+    # Aho-Corasick automata (keyword tries), built on first use
+    _TRIAGE_AUTOMATON = None
+    _MEDICATION_AUTOMATON = None
+    _DRUG_AUTOMATON = None
+    _CONDITION_AUTOMATON = None
+    _INTERACTION_AUTOMATON = None
+
+    @classmethod
+    def _triage_automaton(cls):
+        """Return the automaton mapping each triage keyword to (level, keyword)."""
+        if cls._TRIAGE_AUTOMATON is None:
+            # Emergency entries come last so a keyword in both sets resolves to emergency
+            cls._TRIAGE_AUTOMATON = _keyword_automaton(
+                [(k, (TriageLevel.URGENT, k)) for k in cls.URGENT_KEYWORDS]
+                + [(k, (TriageLevel.EMERGENCY, k)) for k in cls.EMERGENCY_KEYWORDS]
+            )
+        return cls._TRIAGE_AUTOMATON
+
+    @classmethod
+    def _medication_automaton(cls):
+        """Return the automaton over MEDICATION_KEYWORDS."""
+        if cls._MEDICATION_AUTOMATON is None:
+            cls._MEDICATION_AUTOMATON = _keyword_automaton((m, m) for m in cls.MEDICATION_KEYWORDS)
+        return cls._MEDICATION_AUTOMATON
+
+    @classmethod
+    def _drug_automaton(cls):
+        """Return the automaton over CONTRAINDICATIONS drug keys."""
+        if cls._DRUG_AUTOMATON is None:
+            cls._DRUG_AUTOMATON = _keyword_automaton((d, d) for d in cls.CONTRAINDICATIONS)
+        return cls._DRUG_AUTOMATON
+
+    @classmethod
+    def _condition_automaton(cls):
+        """Return the automaton mapping condition phrases to the drugs they rule out."""
+        if cls._CONDITION_AUTOMATON is None:
+            cls._CONDITION_AUTOMATON = _keyword_automaton(cls._CONDITION_TO_DRUGS.items())
+        return cls._CONDITION_AUTOMATON
+
+    @classmethod
+    def _interaction_automaton(cls):
+        """Return the automaton over drugs named in DRUG_INTERACTIONS."""
+        if cls._INTERACTION_AUTOMATON is None:
+            cls._INTERACTION_AUTOMATON = _keyword_automaton((d, d) for d in cls._INTERACTION_TERMS)
+        return cls._INTERACTION_AUTOMATON
+
+    # Recent classifications by input text (follow-ups and retries repeat inputs)
+    _TRIAGE_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+    _TRIAGE_CACHE_LOCK = threading.Lock()
 
     @classmethod
     def classify_triage(cls, user_input: str, patient_data: Dict = None) -> TriageLevel:
         """Classify patient urgency from input text and history."""
+        with cls._TRIAGE_CACHE_LOCK:
+            level = cls._TRIAGE_CACHE.get(user_input)
+        if level is not None:
+            logger.debug(f"Triage cache hit: {level.value}")
+            return level
+
+        level = cls._classify_triage_text(user_input)
+        with cls._TRIAGE_CACHE_LOCK:
+            cls._TRIAGE_CACHE[user_input] = level
+        return level
+
+    @classmethod
+    def classify_triage_batch(cls, user_inputs: Sequence[str]) -> List[TriageLevel]:
+        """
+        Classify many inputs at once (offline evaluation, bulk imports).
+
+        Results match calling `classify_triage` on each input; the cache is
+        consulted and updated under one lock acquisition each.
+        """
+        with cls._TRIAGE_CACHE_LOCK:
+            levels = [cls._TRIAGE_CACHE.get(user_input) for user_input in user_inputs]
+
+        computed = {}
+        for i, user_input in enumerate(user_inputs):
+            if levels[i] is None:
+                if user_input not in computed:
+                    computed[user_input] = cls._classify_triage_text(user_input)
+                levels[i] = computed[user_input]
+
+        if computed:
+            with cls._TRIAGE_CACHE_LOCK:
+                cls._TRIAGE_CACHE.update(computed)
+        return levels
+
+    # Hyperscan database over all triage keywords, compiled on first use
+    _TRIAGE_HS_DB = None
+    _TRIAGE_HS_ENTRIES: Tuple[Tuple[TriageLevel, str], ...] = ()
+    _TRIAGE_HS_LOCK = threading.Lock()
+    # Below this length the Aho-Corasick walk beats Hyperscan's per-scan overhead
+    _TRIAGE_HS_MIN_CHARS = 128
+
+    @classmethod
+    def _classify_triage_text(cls, user_input: str) -> TriageLevel:
+        """Keyword-based triage classification (uncached)."""
+        # No token-hash prefilter: keywords are multi-word substrings ("chest pain"
+        # in "chest pains"), so a per-token filter could miss emergencies, and the
+        # single automaton pass is already one C-level walk over the input
         user_input_lower = user_input.lower()
 
-        # Check emergency keywords
-        for keyword in cls.EMERGENCY_KEYWORDS:
-            if keyword in user_input_lower:
-                logger.warning(f"Emergency detected: {keyword}")
-                return TriageLevel.EMERGENCY
+        if hyperscan is not None and (
+            ahocorasick is None or len(user_input_lower) >= cls._TRIAGE_HS_MIN_CHARS
+        ):
+            hit = cls._scan_triage_hyperscan(user_input_lower)
+        else:
+            hit = cls._scan_triage_keywords(user_input_lower)
+
+        if hit is None:
+            # Default to routine
+            return TriageLevel.ROUTINE
+
+        level, keyword = hit
+        if level is TriageLevel.EMERGENCY:
+            logger.warning(f"Emergency detected: {keyword}")
+        else:
+            logger.info(f"Urgent case detected: {keyword}")
+        return level
+
+    @classmethod
+    def _scan_triage_keywords(cls, user_input_lower: str):
+        """Return (level, keyword) for the deciding triage keyword, or None."""
+        if ahocorasick is not None:
+            # Single pass over the input; emergency wins over any urgent match
+            urgent = None
+            for _, (level, keyword) in cls._triage_automaton().iter(user_input_lower):
+                if level is TriageLevel.EMERGENCY:
+                    return level, keyword
+                if urgent is None:
+                    urgent = (level, keyword)
+            return urgent
+
+        # Check emergency keywords, then urgent keywords
+        if user_input_lower.isascii():
+            buf = user_input_lower.encode("ascii")
+            match = cls._EMERGENCY_BYTES_RE.search(buf)
+            if match:
+                return TriageLevel.EMERGENCY, match.group(0).decode("ascii")
+            match = cls._URGENT_BYTES_RE.search(buf)
+            if match:
+                return TriageLevel.URGENT, match.group(0).decode("ascii")
+            return None
+
+        match = cls._EMERGENCY_RE.search(user_input_lower)
+        if match:
+            return TriageLevel.EMERGENCY, match.group(0)
+        match = cls._URGENT_RE.search(user_input_lower)
+        if match:
+            return TriageLevel.URGENT, match.group(0)
+        return None
+
+    @classmethod
+    def _scan_triage_hyperscan(cls, user_input_lower: str):
+        """Hyperscan variant of `_scan_triage_keywords`; stops at the first emergency."""
+        with cls._TRIAGE_HS_LOCK:
+            if cls._TRIAGE_HS_DB is None:
+                entries = tuple(
+                    [(TriageLevel.EMERGENCY, k) for k in sorted(cls.EMERGENCY_KEYWORDS)]
+                    + [(TriageLevel.URGENT, k) for k in sorted(cls.URGENT_KEYWORDS - cls.EMERGENCY_KEYWORDS)]
+                )
+                db = hyperscan.Database()
+                db.compile(
+                    expressions=[re.escape(k).encode("utf-8") for _, k in entries],
+                    ids=list(range(len(entries))),
+                    elements=len(entries),
+                    flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(entries),
+                )
+                cls._TRIAGE_HS_DB, cls._TRIAGE_HS_ENTRIES = db, entries
+
+            entries = cls._TRIAGE_HS_ENTRIES
+            hits = []
+
+            def on_match(match_id, start, end, flags, context):
+                hits.append(entries[match_id])
+                # A truthy return halts the scan
+                return entries[match_id][0] is TriageLevel.EMERGENCY
 
-        # Check urgent keywords
-        for keyword in cls.URGENT_KEYWORDS:
-            if keyword in user_input_lower:
-                logger.info(f"Urgent case detected: {keyword}")
-                return TriageLevel.URGENT
+            try:
+                # Scratch space belongs to the database, so scans are serialized
+                cls._TRIAGE_HS_DB.scan(user_input_lower.encode("utf-8"), match_event_handler=on_match)
+            except Exception as e:
+                if not (hits and hits[-1][0] is TriageLevel.EMERGENCY):
+                    logger.debug(f"Hyperscan triage scan failed, using keyword scan: {e}")
+                    return cls._scan_triage_keywords(user_input_lower)
 
-        # Default to routine
-        return TriageLevel.ROUTINE
+        for hit in hits:
+            if hit[0] is TriageLevel.EMERGENCY:
+                return hit
+        return hits[0] if hits else None
+
+    @classmethod
+    def _drug_condition_conflict(cls, med_lower: str, patient_conditions: list):
+        """
+        Return the first (drug, condition) contraindication, or None.
+
+        "First" follows the old nested loops: CONTRAINDICATIONS order, then
+        patient condition order. Detected medications are substrings of
+        `med_lower`, so scanning `med_lower` alone finds every drug.
+        """
+        if ahocorasick is not None:
+            drugs_present = {drug for _, drug in cls._drug_automaton().iter(med_lower)}
+        else:
+            drugs_present = {drug for drug in cls.CONTRAINDICATIONS if drug in med_lower}
+        if not drugs_present:
+            return None
+
+        # drug -> first patient condition that rules it out
+        triggered: Dict[str, str] = {}
+        patient_conditions_lower = [condition.lower() for condition in patient_conditions]
+        if ahocorasick is not None:
+            # One walk over all conditions; a match's end offset locates its condition
+            blob = "\n".join(patient_conditions_lower)
+            starts = list(itertools.accumulate(
+                (len(condition) + 1 for condition in patient_conditions_lower[:-1]), initial=0
+            ))
+            first_hit: Dict[str, int] = {}
+            for end, drugs in cls._condition_automaton().iter(blob):
+                index = bisect.bisect_right(starts, end) - 1
+                for drug in drugs & drugs_present:
+                    if index < first_hit.get(drug, len(starts)):
+                        first_hit[drug] = index
+            triggered = {drug: patient_conditions[index] for drug, index in first_hit.items()}
+        else:
+            for condition, condition_lower in zip(patient_conditions, patient_conditions_lower):
+                ruled_out = {
+                    drug for phrase, drugs in cls._CONDITION_TO_DRUGS.items()
+                    if phrase in condition_lower for drug in drugs
+                }
+                for drug in ruled_out & drugs_present:
+                    triggered.setdefault(drug, condition)
+
+        for drug in cls.CONTRAINDICATIONS:
+            if drug in triggered:
+                return drug, triggered[drug]
+        return None
 
     @classmethod
     def check_contraindications(
@@ -167,32 +486,32 @@ class SafetyGuardrail:
         detected_meds = cls._extract_medications_from_text(med_lower)
         
         # Check drug-condition contraindications
-        for med_pattern, contraindicated_conditions in cls.CONTRAINDICATIONS.items():
-            if med_pattern in med_lower or any(med_pattern in dm for dm in detected_meds):
-                for condition in patient_conditions:
-                    condition_lower = condition.lower()
-                    if any(c.lower() in condition_lower for c in contraindicated_conditions):
-                        reason = (
-                            f"CONTRAINDICATION: {med_pattern.title()} is contraindicated "
-                            f"with {condition}"
-                        )
-                        logger.error(reason)
-                        return False, reason
+        conflict = cls._drug_condition_conflict(med_lower, patient_conditions)
+        if conflict:
+            med_pattern, condition = conflict
+            reason = (
+                f"CONTRAINDICATION: {med_pattern.title()} is contraindicated "
+                f"with {condition}"
+            )
+            logger.error(reason)
+            return False, reason
 
         # Check drug-drug interactions
         existing_meds_lower = [m.lower() for m in patient_medications]
+        # Terms hold no newline, so a match in the joined texts lies within one text
+        med_blob = "\n".join((med_lower, *detected_meds, *existing_meds_lower))
+        if ahocorasick is not None:
+            drugs_named = {drug for _, drug in cls._interaction_automaton().iter(med_blob)}
+        else:
+            drugs_named = {drug for drug in cls._INTERACTION_TERMS if drug in med_blob}
         for (drug1, drug2), interaction_msg in cls.DRUG_INTERACTIONS.items():
-            drug1_match = drug1 in med_lower or any(drug1 in dm for dm in detected_meds) or any(drug1 in m for m in existing_meds_lower)
-            drug2_match = drug2 in med_lower or any(drug2 in dm for dm in detected_meds) or any(drug2 in m for m in existing_meds_lower)
-            
-            if drug1_match and drug2_match:
+            if drug1 in drugs_named and drug2 in drugs_named:
                 logger.error(interaction_msg)
                 return False, interaction_msg
 
         # Check for duplicate medication classes (NSAID combinations)
-        nsaids = ["ibuprofen", "naproxen", "aspirin", "nsaid"]
-        nsaid_count = sum(1 for nsaid in nsaids if any(nsaid in m.lower() for m in existing_meds_lower))
-        if any(nsaid in med_lower for nsaid in nsaids) and nsaid_count > 0:
+        recommended_is_nsaid = cls._NSAID_RE.search(med_lower) is not None
+        if recommended_is_nsaid and any(cls._NSAID_RE.search(m) for m in existing_meds_lower):
             reason = "CONTRAINDICATION: NSAID combination detected - increased GI and bleeding risk"
             logger.error(reason)
             return False, reason
@@ -200,56 +519,70 @@ class SafetyGuardrail:
         return True, "No contraindications detected"
     
     @classmethod
-    def _extract_medications_from_text(cls, text: str) -> list:
+    @lru_cache(maxsize=2048)  # recommendations are re-validated across patients and retries
+    def _extract_medications_from_text(cls, text: str) -> Tuple[str, ...]:
         """Extract medication names from text."""
-        medications = []
-        med_keywords = [
-            "naproxen", "ibuprofen", "aspirin", "metformin", "warfarin", 
-            "lisinopril", "enalapril", "atorvastatin", "simvastatin",
-            "fluoxetine", "sertraline", "tramadol", "codeine", "morphine",
-            "vitamin k", "potassium", "magnesium", "calcium", "iron",
-            "amoxicillin", "penicillin", "antibiotics", "steroids",
-        ]
-        for med in med_keywords:
-            if med in text:
-                medications.append(med)
-        return medications
+        if ahocorasick is not None:
+            # One trie walk reports every keyword occurrence, overlaps included
+            found = {med for _, med in cls._medication_automaton().iter(text)}
+        else:
+            found = set(cls._MEDICATION_RE.findall(text))
+        return tuple(med for med in cls.MEDICATION_KEYWORDS if med in found)
 
     @classmethod
     def validate_response(cls, response: str, safety_score: int) -> Tuple[bool, str]:
         """Validate response meets safety thresholds."""
-        from src.config import settings
-
         if safety_score < settings.safety_score_min:
             reason = f"Safety score {safety_score} below threshold {settings.safety_score_min}"
             logger.warning(reason)
             return False, reason
 
         # Check for dangerous language patterns
-        dangerous_patterns = [
-            "ignore your doctor",
-            "stop taking",
-            "don't go to hospital",
-            "no need for emergency",
-            "untested remedy",
-        ]
-
-        for pattern in dangerous_patterns:
-            if pattern.lower() in response.lower():
-                reason = f"Dangerous language detected: '{pattern}'"
-                logger.error(reason)
-                return False, reason
+        response_lower = response.lower()
+        match = cls._DANGEROUS_RE.search(response_lower)
+        if match:
+            reason = f"Dangerous language detected: '{match.group(0)}'"
+            logger.error(reason)
+            return False, reason
 
         return True, "Response passes safety validation"
 
+    @classmethod
+    def validate_responses_batch(
+        cls, responses: Sequence[str], safety_scores: Sequence[int]
+    ) -> List[Tuple[bool, str]]:
+        """
+        Validate many responses at once (offline evaluation, reranking).
+
+        Results match calling `validate_response` on each pair; the score
+        threshold is applied as one array comparison and failures are
+        logged once for the whole batch.
+        """
+        if len(responses) != len(safety_scores):
+            raise ValueError("responses and safety_scores must have the same length")
+
+        scores = np.asarray(safety_scores)
+        below_threshold = scores < settings.safety_score_min
+
+        results: List[Tuple[bool, str]] = []
+        for response, score, low in zip(responses, safety_scores, below_threshold.tolist()):
+            if low:
+                results.append(
+                    (False, f"Safety score {score} below threshold {settings.safety_score_min}")
+                )
+                continue
+            match = cls._DANGEROUS_RE.search(response.lower())
+            if match:
+                results.append((False, f"Dangerous language detected: '{match.group(0)}'"))
+            else:
+                results.append((True, "Response passes safety validation"))
+
+        failed = sum(not passed for passed, _ in results)
+        if failed:
+            logger.warning(f"{failed}/{len(results)} responses failed safety validation")
+        return results
+
     @classmethod
     def get_emergency_response(cls) -> str:
         """Get hard-coded emergency response."""
-        return (
-            "🚨 EMERGENCY ALERT 🚨\n\n"
-            "Your symptoms require IMMEDIATE medical attention.\n"
-            "CALL 911 OR GO TO THE NEAREST EMERGENCY ROOM IMMEDIATELY.\n\n"
-            "Do not wait. Do not delay.\n"
-            "Your healthcare provider has been alerted.\n"
-            "Emergency services are recommended for your safety."
-        )
+        return cls.EMERGENCY_RESPONSE
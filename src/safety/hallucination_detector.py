@@ -2,11 +2,62 @@
 
 import logging
 import re
-from typing import Tuple, List, Dict, Any
+import threading
+from typing import Iterable, Optional, Tuple, List, Dict, Any
 import asyncio
+from enum import Enum
+
+from cachetools import TTLCache
+
+from src.config import settings
+from src.safety.bloom import BloomFilter
+from src.safety.term_index import TermIndex
 
 logger = logging.getLogger(__name__)
 
+# Compiled once; term extraction and suspicion checks run on every response
+# One pass finds unusual-caps words ("BloodHarmony"), capitalized phrases
+# ("Fictitious Syndrome Z") and quoted phrases. The two word patterns can
+# never match at the same position; the quoted one is a lookahead so words
+# inside quotes are still scanned.
+_TERM_RE = re.compile(
+    r"(?P<unusual>\b[A-Z][a-z]+[A-Z][a-z]+\b)"
+    r"|(?P<capitalized>\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b)"
+    r"|(?=['\"](?P<quoted>[^'\"]+)['\"])"
+)
+# Words for the KB Bloom filter; KB text and extracted terms are split the
+# same way, so punctuation ("Angioedema,") never hides a KB word
+_WORD_RE = re.compile(r"\w+")
+# A quoted phrase counts only if one of these appears just before it
+_QUOTE_CONTEXT_WORDS = ('drug', 'medication', 'syndrome', 'disease', 'test', 'condition')
+_QUOTE_CONTEXT_RE = re.compile("|".join(_QUOTE_CONTEXT_WORDS))
+# All suspicion evidence in one scan. Made-up patterns ("Quantum healing",
+# "Magical cure", "Super treatment", "Miracle cure", "Fittingness syndrome")
+# are tried first at each position so a special character can't consume
+# the start of one; runs of 3+ digits and special characters follow.
+_SUSPICIOUS_RE = re.compile(
+    r"(?P<madeup>(?i:quantum|magical|super|miracle)\s+\w+|\w+(?i:ness)\s+\w+)"
+    r"|(?P<digits>[0-9]{3,})"
+    r"|(?P<special>[^a-zA-Z0-9\s])"
+)
+
+
+class TermVerdict(str, Enum):
+    """Local verdict for a single term (see HallucinationDetector._fast_classify)."""
+
+    LEGITIMATE = "legitimate"
+    FAKE = "fake"
+    SUSPICIOUS = "suspicious"
+    NOT_IN_KB = "not_in_kb"
+    UNKNOWN = "unknown"
+
+
+_VERDICT_LOG = {
+    TermVerdict.FAKE: "Known fake term detected",
+    TermVerdict.SUSPICIOUS: "Suspicious term detected",
+    TermVerdict.NOT_IN_KB: "Term not in KB",
+}
+
 
 class HallucinationDetector:
     """
@@ -24,7 +75,7 @@ class HallucinationDetector:
     }
 
     # Known legitimate medical terms (whitelist for quick checks)
-    KNOWN_LEGITIMATE_TERMS = {
+    KNOWN_LEGITIMATE_TERMS = frozenset({
         # Common conditions
         "diabetes", "hypertension", "asthma", "arthritis", "cancer", "depression",
         "anxiety", "heart disease", "stroke", "pneumonia", "bronchitis", "flu",
@@ -42,14 +93,88 @@ class HallucinationDetector:
         
         # Common procedures
         "surgery", "vaccination", "therapy", "dialysis", "chemotherapy",
-    }
+    })
 
     # Fake/non-existent medical terms (blacklist for known hallucinations)
-    KNOWN_FAKE_TERMS = {
+    KNOWN_FAKE_TERMS = frozenset({
         "fictitious syndrome z", "fictitious syndrome", "imaginex", "bloodharmony panel",
         "quantum healing", "chakra medicine", "homeopathic magic",
         "blood harmony", "bloodharmony", "quantum nervous system",
-    }
+    })
+
+    # Blacklisted terms anywhere in a response, in one scan; catches ones the
+    # capitalization-based extraction misses ("imaginex", "quantum healing")
+    _FAKE_TERM_INDEX = TermIndex(KNOWN_FAKE_TERMS)
+
+    # Common English words that are never treated as medical terms
+    _COMMON_WORDS = frozenset({
+        'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'this', 'that',
+        'these', 'those', 'what', 'which', 'who', 'how', 'where', 'when',
+        'why', 'should', 'could', 'would', 'may', 'might', 'must', 'will',
+        'can', 'has', 'have', 'had', 'do', 'does', 'did', 'been', 'be',
+        'about', 'of', 'in', 'to', 'for', 'with', 'from', 'as', 'by',
+    })
+
+    # Word n-grams of the whole KB collection; lets terms that cannot be in
+    # the KB skip the knowledge base lookup. None (disabled) until a filter
+    # built from the full collection is loaded with `load_kb_bloom`.
+    _KB_BLOOM: Optional[BloomFilter] = None
+    KB_BLOOM_CAPACITY = 1_000_000
+    KB_BLOOM_MAX_WORDS = 4
+
+    @classmethod
+    def build_kb_bloom(cls, texts: Iterable[str]) -> BloomFilter:
+        """Build a Bloom filter of the word n-grams of knowledge base texts."""
+        bloom = BloomFilter(capacity=cls.KB_BLOOM_CAPACITY, error_rate=0.01)
+        cls._add_kb_ngrams(bloom, texts)
+        return bloom
+
+    @classmethod
+    def load_kb_bloom(cls, bloom: Optional[BloomFilter]) -> None:
+        """
+        Enable `bloom` for KB pre-checks (None disables them).
+
+        Only pass a filter covering the entire collection: any KB text
+        missing from it would be reported as a hallucination.
+        """
+        cls._KB_BLOOM = bloom
+
+    @classmethod
+    def register_kb_texts(cls, texts: Iterable[str]) -> None:
+        """
+        Add newly ingested KB texts to the loaded filter, keeping it complete.
+
+        Does nothing while no filter is loaded; a partial ingest never
+        enables one.
+        """
+        bloom = cls._KB_BLOOM
+        if bloom is not None:
+            cls._add_kb_ngrams(bloom, texts)
+
+    @classmethod
+    def _add_kb_ngrams(cls, bloom: BloomFilter, texts: Iterable[str]) -> None:
+        """Add the 1..KB_BLOOM_MAX_WORDS word n-grams of each text to `bloom`."""
+        for text in texts:
+            words = _WORD_RE.findall(text.lower())
+            for n in range(1, cls.KB_BLOOM_MAX_WORDS + 1):
+                for i in range(len(words) - n + 1):
+                    bloom.add(" ".join(words[i:i + n]))
+
+    @classmethod
+    def _definitely_not_in_kb(cls, term_lower: str) -> bool:
+        """True if the KB Bloom filter rules the term out without a lookup."""
+        bloom = cls._KB_BLOOM
+        if bloom is None:
+            return False
+        words = _WORD_RE.findall(term_lower)
+        if not words or len(words) > cls.KB_BLOOM_MAX_WORDS:
+            return False
+        return " ".join(words) not in bloom
+
+    # Results of KB-free detection by response text (the deterministic path)
+    _DETECTION_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=600)
+    _DETECTION_CACHE_LOCK = threading.Lock()
 
     @classmethod
     def detect_hallucinations(
@@ -71,51 +196,138 @@ class HallucinationDetector:
             - feedback: Explanation of what was hallucinated
             - suspected_terms: List of terms that appear to be hallucinated
         """
+        if knowledge_base_search_fn is not None:
+            return cls._detect(response, knowledge_base_search_fn)
+
+        with cls._DETECTION_CACHE_LOCK:
+            cached = cls._DETECTION_CACHE.get(response)
+        if cached is not None:
+            logger.debug("Hallucination detection cache hit")
+        else:
+            cached = cls._detect(response, None)
+            with cls._DETECTION_CACHE_LOCK:
+                cls._DETECTION_CACHE[response] = cached
+        is_hallucinating, feedback, suspected_terms = cached
+        return is_hallucinating, feedback, list(suspected_terms)
+
+    @classmethod
+    async def adetect_hallucinations(
+        cls,
+        response: str,
+        knowledge_base_search_fn=None,
+    ) -> Tuple[bool, str, List[str]]:
+        """Async variant of `detect_hallucinations` for callers already in an event loop."""
+        if knowledge_base_search_fn is None:
+            return cls.detect_hallucinations(response)
+
+        screened = cls._screen_terms(response, check_kb=True)
+        if screened is None:
+            return False, "No medical terms to validate", []
+        suspected_terms, to_check = screened
+        if to_check and settings.hallucination_kb_lookup:
+            suspected_terms += await cls._kb_misses(to_check, knowledge_base_search_fn)
+        return cls._detection_result(suspected_terms)
+
+    @classmethod
+    def _detect(
+        cls,
+        response: str,
+        knowledge_base_search_fn,
+    ) -> Tuple[bool, str, List[str]]:
+        """Run detection for `detect_hallucinations` (uncached)."""
+        screened = cls._screen_terms(response, check_kb=knowledge_base_search_fn is not None)
+        if screened is None:
+            return False, "No medical terms to validate", []
+        suspected_terms, to_check = screened
+
+        # Terms resolved locally never start an event loop
+        if to_check and settings.hallucination_kb_lookup:
+            try:
+                # All KB checks share one event loop and run concurrently
+                suspected_terms += asyncio.run(cls._kb_misses(to_check, knowledge_base_search_fn))
+            except Exception as e:
+                # Don't mark as hallucination if KB search fails
+                logger.debug(f"KB search failed: {e}")
+
+        return cls._detection_result(suspected_terms)
+
+    @classmethod
+    def _screen_terms(cls, response: str, check_kb: bool) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Classify extracted terms without touching the knowledge base.
+
+        Returns (suspected_terms, terms_needing_kb_check), or None when the
+        response has no medical terms. Terms go to the KB only if `check_kb`.
+        """
         suspected_terms = []
-        feedback = ""
+        to_check = []
 
         # Extract medical terms from response
         extracted_terms = cls._extract_medical_terms(response)
+        fake_terms = cls._FAKE_TERM_INDEX.terms_in(response)
         
-        if not extracted_terms:
-            return False, "No medical terms to validate", []
+        if not extracted_terms and not fake_terms:
+            return None
 
-        # Check each extracted term
         for term in extracted_terms:
-            term_lower = term.lower()
-            
-            # Quick check: Known fake terms
-            if term_lower in cls.KNOWN_FAKE_TERMS:
+            verdict = cls._fast_classify(term, use_kb_bloom=check_kb)
+            if verdict == TermVerdict.UNKNOWN:
+                if check_kb:
+                    to_check.append(term)
+            elif verdict != TermVerdict.LEGITIMATE:
                 suspected_terms.append(term)
-                logger.warning(f"[HALLUCINATION] Known fake term detected: {term}")
-                continue
-            
-            # Quick check: Known legitimate terms (pass)
-            if term_lower in cls.KNOWN_LEGITIMATE_TERMS:
-                continue
-            
-            # Check if term looks suspicious (too long, unusual patterns)
-            if cls._looks_suspicious(term):
+                logger.warning(f"[HALLUCINATION] {_VERDICT_LOG[verdict]}: {term}")
+
+        # Blacklisted terms not already part of an extracted term
+        extracted_lower = [term.lower() for term in extracted_terms]
+        for term in fake_terms:
+            if not any(term in extracted for extracted in extracted_lower):
                 suspected_terms.append(term)
-                logger.warning(f"[HALLUCINATION] Suspicious term detected: {term}")
-                continue
-            
-            # Check against knowledge base if available
-            if knowledge_base_search_fn:
-                try:
-                    # Run async check synchronously
-                    exists_in_kb = asyncio.run(
-                        knowledge_base_search_fn(term)
-                    )
-                    if not exists_in_kb:
-                        suspected_terms.append(term)
-                        logger.warning(f"[HALLUCINATION] Term not in KB: {term}")
-                except Exception as e:
-                    logger.debug(f"KB search failed for {term}: {e}")
-                    # Don't mark as hallucination if KB search fails
-                    pass
-
-        # Generate feedback
+                logger.warning(f"[HALLUCINATION] {_VERDICT_LOG[TermVerdict.FAKE]}: {term}")
+
+        return suspected_terms, to_check
+
+    @classmethod
+    def _fast_classify(cls, term: str, use_kb_bloom: bool) -> TermVerdict:
+        """
+        Decide a term locally, without the knowledge base.
+
+        Checks run cheapest first: blacklist, whitelist, suspicion
+        heuristics, then (if `use_kb_bloom`) the KB Bloom filter. UNKNOWN
+        means only a KB lookup can tell.
+        """
+        term_lower = term.lower()
+        if term_lower in cls.KNOWN_FAKE_TERMS:
+            return TermVerdict.FAKE
+        if term_lower in cls.KNOWN_LEGITIMATE_TERMS:
+            return TermVerdict.LEGITIMATE
+        # Too long, unusual patterns
+        if cls._looks_suspicious(term):
+            return TermVerdict.SUSPICIOUS
+        if use_kb_bloom and cls._definitely_not_in_kb(term_lower):
+            return TermVerdict.NOT_IN_KB
+        return TermVerdict.UNKNOWN
+
+    @staticmethod
+    async def _kb_misses(terms: List[str], knowledge_base_search_fn) -> List[str]:
+        """Check terms against the KB concurrently; return those not found."""
+        results = await asyncio.gather(
+            *(knowledge_base_search_fn(term) for term in terms),
+            return_exceptions=True,
+        )
+        missing = []
+        for term, exists_in_kb in zip(terms, results):
+            if isinstance(exists_in_kb, Exception):
+                # Don't mark as hallucination if KB search fails
+                logger.debug(f"KB search failed for {term}: {exists_in_kb}")
+            elif not exists_in_kb:
+                missing.append(term)
+                logger.warning(f"[HALLUCINATION] Term not in KB: {term}")
+        return missing
+
+    @staticmethod
+    def _detection_result(suspected_terms: List[str]) -> Tuple[bool, str, List[str]]:
+        """Build the (is_hallucinating, feedback, suspected_terms) result."""
         if suspected_terms:
             feedback = (
                 f"Potential hallucinations detected: {', '.join(suspected_terms)}. "
@@ -128,38 +340,36 @@ class HallucinationDetector:
 
     @classmethod
     def _extract_medical_terms(cls, text: str) -> List[str]:
-        """Extract medical terms from text."""
-        terms = set()
+        """
+        Extract candidate medical terms from text (distinct, in text order).
+
+        Terms keep their original case; callers lowercase for comparisons.
+        """
+        terms: Dict[str, None] = {}
         text_lower = text.lower()
+        quoted_end = 0
 
-        # Look for capitalized terms that might be condition/drug names
-        # e.g., "Fictitious Syndrome Z", "Imaginex", "BloodHarmony Panel"
-        capitalized_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        
-        for match in re.finditer(capitalized_pattern, text):
-            term = match.group(0)
-            # Filter out common English words
-            if not cls._is_common_word(term) and len(term) > 2:
-                terms.add(term)
-                # Also add lowercase version for fallback matching
-                terms.add(term.lower())
-
-        # Also look for quoted terms or phrases after specific words
-        quoted_pattern = r"['\"]([^'\"]+)['\"]"
-        for match in re.finditer(quoted_pattern, text):
-            term = match.group(1)
-            if any(keyword in text_lower[max(0, match.start()-50):match.start()]
-                   for keyword in ['drug', 'medication', 'syndrome', 'disease', 'test', 'condition']):
-                terms.add(term)
-                terms.add(term.lower())
-
-        # Look for unusual capitalization patterns (e.g., "BloodHarmony Panel")
-        # Words with unusual capitalization in the middle
-        unusual_cap_pattern = r'\b[A-Z][a-z]+[A-Z][a-z]+\b'
-        for match in re.finditer(unusual_cap_pattern, text):
-            term = match.group(0)
-            terms.add(term)
-            terms.add(term.lower())
+        for match in _TERM_RE.finditer(text):
+            kind = match.lastgroup
+            if kind == "quoted":
+                # Quoted phrases don't overlap: a closing quote never opens another
+                start = match.start()
+                if start < quoted_end:
+                    continue
+                term = match.group("quoted")
+                quoted_end = start + len(term) + 2
+                # Searched in place over the 50 characters before the quote
+                if _QUOTE_CONTEXT_RE.search(text_lower, max(0, start - 50), start):
+                    terms[term] = None
+            elif kind == "capitalized":
+                # Capitalized terms that might be condition/drug names,
+                # minus common English words
+                term = match.group(0)
+                if not cls._is_common_word(term) and len(term) > 2:
+                    terms[term] = None
+            else:
+                # Unusual capitalization in the middle of a word
+                terms[match.group(0)] = None
 
         return list(terms)
 
@@ -172,25 +382,14 @@ class HallucinationDetector:
         if len(term) > 50:
             return True
         
-        # Terms with unusual character patterns
-        if re.search(r'[0-9]{3,}', term):  # Multiple consecutive numbers
-            return True
-        
-        # Multiple special characters
-        if len(re.findall(r'[^a-zA-Z0-9\s]', term)) > 2:
-            return True
-        
-        # Common made-up suffixes/patterns
-        made_up_patterns = [
-            r'quantum\s+\w+',  # "Quantum healing"
-            r'magical\s+\w+',  # "Magical cure"
-            r'super\s+\w+',    # "Super treatment"
-            r'miracle\s+\w+',  # "Miracle cure"
-            r'\w+ness\s+\w+',  # "Fittingness syndrome"
-        ]
-        
-        for pattern in made_up_patterns:
-            if re.search(pattern, term.lower()):
+        # Made-up patterns or multiple consecutive numbers flag at once;
+        # more than two special characters also does
+        specials = 0
+        for match in _SUSPICIOUS_RE.finditer(term):
+            if match.lastgroup != "special":
+                return True
+            specials += 1
+            if specials > 2:
                 return True
         
         return False
@@ -198,15 +397,7 @@ class HallucinationDetector:
     @classmethod
     def _is_common_word(cls, term: str) -> bool:
         """Check if a term is a common English word (not a medical term)."""
-        common_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'this', 'that',
-            'these', 'those', 'what', 'which', 'who', 'how', 'where', 'when',
-            'why', 'should', 'could', 'would', 'may', 'might', 'must', 'will',
-            'can', 'has', 'have', 'had', 'do', 'does', 'did', 'been', 'be',
-            'about', 'of', 'in', 'to', 'for', 'with', 'from', 'as', 'by',
-        }
-        return term.lower() in common_words
+        return term.lower() in cls._COMMON_WORDS
 
     @classmethod
     async def validate_against_knowledge_base(
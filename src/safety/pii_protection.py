@@ -1,107 +1,397 @@
 """PII (Personally Identifiable Information) protection."""
 
-from presidio_analyzer import AnalyzerEngine
+from presidio_analyzer import AnalyzerEngine, RecognizerResult
+from presidio_analyzer.nlp_engine import NlpArtifacts
+from presidio_analyzer.predefined_recognizers import PhoneRecognizer
 from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import OperatorConfig
 import logging
-from typing import Dict, Any, List
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Any, Iterable, List, Optional
+
+from cachetools import LRUCache
+
+from src.utils import hash_input
+
+try:
+    import re2
+except ImportError:  # Optional accelerator; the structured scan falls back to stdlib re
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:  # Optional accelerator; structured scans skip the DFA prefilter
+    hyperscan = None
+
+__all__ = ["PIIHit", "PIIProtector", "get_pii_protector", "pii_protector"]
 
 logger = logging.getLogger(__name__)
 
+# Structured entities are plain patterns (lookaround-free so RE2 accepts them),
+# matched in one combined scan; each has a confidence and optional validator.
+# Card numbers come after SSN so a failed Luhn check on a long digit run
+# can't hide them. Phone numbers (unseparated, international) are too varied
+# for a pattern and use Presidio's phonenumbers-based PhoneRecognizer; only
+# the NER entities go through Presidio's spaCy pipeline.
+STRUCTURED_PII_PATTERNS = {
+    "EMAIL_ADDRESS": (r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b", 1.0),
+    "IBAN_CODE": (r"\b[A-Z]{2}[0-9]{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?\b", 1.0),
+    "US_SSN": (r"\b[0-9]{3}-[0-9]{2}-[0-9]{4}\b", 0.85),
+    "CREDIT_CARD": (r"\b(?:[0-9][ -]?){12,18}[0-9]\b", 1.0),
+    "US_DRIVER_LICENSE": (r"\b[A-Z][0-9]{7}\b", 0.3),
+}
+NER_PII_ENTITIES = ("PERSON", "DATE_TIME")
+_NER_PII_ENTITY_SET = frozenset(NER_PII_ENTITIES)
+# One shared (never mutated) Presidio entity list per requested NER subset
+_NER_ENTITY_LISTS = {
+    frozenset({"PERSON"}): ["PERSON"],
+    frozenset({"DATE_TIME"}): ["DATE_TIME"],
+    _NER_PII_ENTITY_SET: list(NER_PII_ENTITIES),
+}
+_PERSON_ONLY = frozenset({"PERSON"})
+# Texts per spaCy `nlp.pipe` batch in detect_pii_batch
+_NLP_BATCH_SIZE = 32
+
+_STRUCTURED_PII_RE = (re2 or re).compile(
+    "|".join(f"(?P<{entity}>{pattern})" for entity, (pattern, _) in STRUCTURED_PII_PATTERNS.items())
+)
+
+# Needs no NLP artifacts, so it runs outside the analyzer on any text with a digit
+_PHONE_RECOGNIZER = PhoneRecognizer()
+_PHONE_ENTITIES = ["PHONE_NUMBER"]
+
+_PII_SIGNAL_RE = re.compile(r"[@0-9A-Z]")
+# Every structured entity needs an ASCII digit, or "@" for emails
+_STRUCTURED_SIGNAL_RE = re.compile(r"[@0-9]")
+
+
+def _build_structured_db():
+    """Compile the structured patterns into one Hyperscan database (None without hyperscan)."""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[pattern.encode() for pattern, _ in STRUCTURED_PII_PATTERNS.values()],
+        ids=list(range(len(STRUCTURED_PII_PATTERNS))),
+        elements=len(STRUCTURED_PII_PATTERNS),
+        flags=hyperscan.HS_FLAG_SINGLEMATCH,
+    )
+    return db
+
+
+_STRUCTURED_DB = _build_structured_db()
+# A database owns one scratch space, which concurrent scans must not share
+_STRUCTURED_DB_LOCK = threading.Lock()
+
+
+def _stop_scan(*_) -> bool:
+    """Hyperscan match callback: the first match settles the prefilter."""
+    return True
+
+
+def _may_contain_structured_pii(text: str) -> bool:
+    """
+    Cheap exact test for whether `_STRUCTURED_PII_RE` can match at all.
+
+    With Hyperscan, ASCII text is screened in one DFA pass over all
+    patterns, stopping at the first match; the regex then runs only to
+    recover spans. Non-ASCII text skips the DFA, whose `\\w`/`\\b` are ASCII.
+    """
+    if not _STRUCTURED_SIGNAL_RE.search(text):
+        return False
+    if _STRUCTURED_DB is None or not text.isascii():
+        return True
+    try:
+        with _STRUCTURED_DB_LOCK:
+            _STRUCTURED_DB.scan(text.encode("ascii"), match_event_handler=_stop_scan)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
+def _luhn_valid(number: str) -> bool:
+    """Luhn checksum over the digits of a card number."""
+    digits = [int(c) for c in number if c.isdigit()]
+    total = sum(digits[-1::-2]) + sum(sum(divmod(2 * d, 10)) for d in digits[-2::-2])
+    return total % 10 == 0
+
+
+def _ssn_valid(ssn: str) -> bool:
+    """Reject SSNs with never-issued area, group or serial numbers."""
+    area, group, serial = ssn.split("-")
+    return area not in ("000", "666") and area[0] != "9" and group != "00" and serial != "0000"
+
+
+def _iban_valid(iban: str) -> bool:
+    """ISO 13616 mod-97 check."""
+    compact = iban.replace(" ", "")
+    rearranged = compact[4:] + compact[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+_STRUCTURED_PII_VALIDATORS = {
+    "CREDIT_CARD": _luhn_valid,
+    "US_SSN": _ssn_valid,
+    "IBAN_CODE": _iban_valid,
+}
+
+# Degraded-mode masking when Presidio fails: one pass, email tried first
+_FALLBACK_MASK_RE = re.compile(
+    r"(?P<EMAIL>[\w\.-]+@[\w\.-]+)|(?P<PHONE>\b\d{3}-\d{3}-\d{4}\b)|(?P<SSN>\b\d{3}-\d{2}-\d{4}\b)"
+)
+_FALLBACK_MASKS = {"EMAIL": "[EMAIL]", "PHONE": "[PHONE]", "SSN": "[SSN]"}
+
+# The anonymizer merges same-type entities separated by nothing but spaces
+_SPACES_ONLY_RE = re.compile(" +")
+
+
+@dataclass(frozen=True)
+class PIIHit:
+    """A detected PII span; `value` is sliced from the source text only when read."""
+
+    entity_type: str
+    start: int
+    end: int
+    confidence: float
+    text_ref: str = field(repr=False)
+
+    @property
+    def value(self) -> str:
+        """The matched text."""
+        return self.text_ref[self.start : self.end]
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access (`hit["entity_type"]`), as for the former dict results."""
+        return getattr(self, key)
+
 
 class PIIProtector:
     """Protect PII in patient communications."""
 
+    # Entities detected and masked by default
+    _ENTITIES = (
+        "PERSON",
+        "EMAIL_ADDRESS",
+        "PHONE_NUMBER",
+        "CREDIT_CARD",
+        "US_SSN",
+        "US_DRIVER_LICENSE",
+        "IBAN_CODE",
+        "DATE_TIME",
+    )
+    # frozenset(_ENTITY_SET) is the set itself, so analysis keys cost no copy
+    _ENTITY_SET = frozenset(_ENTITIES)
+
+    # Replacement text per entity, and the matching anonymizer operators
+    _PLACEHOLDERS = {
+        "PERSON": "[NAME]",
+        "EMAIL_ADDRESS": "[EMAIL]",
+        "PHONE_NUMBER": "[PHONE]",
+        "CREDIT_CARD": "[CREDIT_CARD]",
+        "US_SSN": "[SSN]",
+        "US_DRIVER_LICENSE": "[LICENSE]",
+        "IBAN_CODE": "[IBAN]",
+        "DATE_TIME": "[DATE]",
+    }
+    _OPERATORS = {
+        entity: OperatorConfig("replace", {"new_value": placeholder})
+        for entity, placeholder in _PLACEHOLDERS.items()
+    }
+
     def __init__(self):
-        """Initialize Presidio engines."""
-        self.analyzer = AnalyzerEngine()
-        self.anonymizer = AnonymizerEngine()
+        """Initialize caches; Presidio engines are built on first use."""
+        # Analysis results by (input hash, entities); one message is
+        # typically detected, checked and masked in the same request
+        self._analysis_cache: LRUCache = LRUCache(maxsize=1024)
+        self._analysis_cache_lock = threading.Lock()
+
+    @cached_property
+    def analyzer(self) -> AnalyzerEngine:
+        """Presidio analyzer (loads the spaCy pipeline)."""
+        return AnalyzerEngine()
+
+    @cached_property
+    def anonymizer(self) -> AnonymizerEngine:
+        """Presidio anonymizer."""
+        return AnonymizerEngine()
+
+    @staticmethod
+    def _scan_structured(text: str) -> List[RecognizerResult]:
+        """Find structured PII: one pass of the combined pattern, plus phone numbers."""
+        results = []
+        if not _STRUCTURED_SIGNAL_RE.search(text):
+            return results
+        if _may_contain_structured_pii(text):
+            for match in _STRUCTURED_PII_RE.finditer(text):
+                entity = match.lastgroup
+                validator = _STRUCTURED_PII_VALIDATORS.get(entity)
+                if validator is not None and not validator(match.group(0)):
+                    continue
+                results.append(
+                    RecognizerResult(entity, match.start(), match.end(), STRUCTURED_PII_PATTERNS[entity][1])
+                )
+        phones = _PHONE_RECOGNIZER.analyze(text, _PHONE_ENTITIES, None)
+        if phones:
+            results.extend(phones)
+            results.sort(key=lambda r: r.start)
+        return results
+
+    def _analyze(self, text: str, entities: Iterable[str]) -> List[RecognizerResult]:
+        """Cached structured scan plus Presidio NER for `entities`."""
+        entities = frozenset(entities)
+        key = (hash_input(text), entities)
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(key)
+        if cached is None:
+            cached = tuple(self._analyze_uncached(text, entities))
+            with self._analysis_cache_lock:
+                self._analysis_cache[key] = cached
+        return list(cached)
 
-    def detect_pii(self, text: str) -> List[Dict[str, Any]]:
+    def _analyze_uncached(
+        self, text: str, entities: frozenset, nlp_artifacts: Optional[NlpArtifacts] = None
+    ) -> List[RecognizerResult]:
+        """Structured scan plus Presidio NER, the latter only if NER entities are requested."""
+        results = [r for r in self._scan_structured(text) if r.entity_type in entities]
+        ner_entities = _NER_ENTITY_LISTS.get(entities & _NER_PII_ENTITY_SET)
+        if ner_entities:
+            results.extend(
+                self.analyzer.analyze(
+                    text=text, language="en", entities=ner_entities, nlp_artifacts=nlp_artifacts
+                )
+            )
+            results.sort(key=lambda r: r.start)
+        return results
+
+    def _analyze_batch(self, texts: List[str], entities: frozenset) -> List[List[RecognizerResult]]:
+        """`_analyze` for many texts; uncached ones share one batched spaCy pass."""
+        keys = [(hash_input(text), entities) for text in texts]
+        with self._analysis_cache_lock:
+            found = {key: self._analysis_cache.get(key) for key in keys}
+
+        missing = {key: text for key, text in zip(keys, texts) if found[key] is None}
+        if missing:
+            if entities & _NER_PII_ENTITY_SET:
+                batch = self.analyzer.nlp_engine.process_batch(
+                    texts=list(missing.values()), language="en", batch_size=_NLP_BATCH_SIZE
+                )
+                analyzed = [self._analyze_uncached(text, entities, artifacts) for text, artifacts in batch]
+            else:
+                analyzed = [self._analyze_uncached(text, entities) for text in missing.values()]
+            computed = dict(zip(missing, map(tuple, analyzed)))
+            found.update(computed)
+            with self._analysis_cache_lock:
+                self._analysis_cache.update(computed)
+
+        return [list(found[key]) for key in keys]
+
+    def clear_cache(self) -> None:
+        """Drop cached analysis results."""
+        with self._analysis_cache_lock:
+            self._analysis_cache.clear()
+
+    def detect_pii(
+        self,
+        text: str,
+        entities: Iterable[str] = _ENTITY_SET,
+    ) -> List[PIIHit]:
         """Detect PII entities in text."""
         try:
-            results = self.analyzer.analyze(
-                text=text,
-                language="en",
-                entities=[
-                    "PERSON",
-                    "EMAIL_ADDRESS",
-                    "PHONE_NUMBER",
-                    "CREDIT_CARD",
-                    "US_SSN",
-                    "US_DRIVER_LICENSE",
-                    "IBAN_CODE",
-                    "DATE_TIME",
-                ],
-            )
+            results = self._analyze(text, entities)
 
             pii_list = [
-                {
-                    "entity_type": result.entity_type,
-                    "value": text[result.start : result.end],
-                    "confidence": result.score,
-                }
+                PIIHit(result.entity_type, result.start, result.end, result.score, text)
                 for result in results
             ]
 
             if pii_list:
-                logger.warning(f"PII detected: {[p['entity_type'] for p in pii_list]}")
+                logger.warning(f"PII detected: {[p.entity_type for p in pii_list]}")
 
             return pii_list
         except Exception as e:
             logger.error(f"PII detection failed: {e}")
             return []
 
+    @classmethod
+    def _replace_disjoint(cls, text: str, results: List[RecognizerResult]) -> Optional[str]:
+        """
+        Splice placeholders over sorted, non-overlapping results in one pass.
+
+        Matches the anonymizer's output for such results, including its
+        merge of same-type entities separated only by spaces. Returns None
+        when spans overlap, leaving conflict resolution to Presidio.
+        """
+        merged: List[List[Any]] = []  # [entity_type, start, end]
+        for result in results:
+            if merged and result.start < merged[-1][2]:
+                return None
+            if (
+                merged
+                and merged[-1][0] == result.entity_type
+                and _SPACES_ONLY_RE.fullmatch(text, merged[-1][2], result.start)
+            ):
+                merged[-1][2] = result.end
+            else:
+                merged.append([result.entity_type, result.start, result.end])
+
+        pieces = []
+        position = 0
+        for entity_type, start, end in merged:
+            pieces.append(text[position:start])
+            pieces.append(cls._PLACEHOLDERS[entity_type])
+            position = end
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    def detect_pii_batch(
+        self,
+        texts: Iterable[str],
+        entities: Iterable[str] = _ENTITY_SET,
+    ) -> List[List[PIIHit]]:
+        """
+        Detect PII in many texts; results match `detect_pii` per text.
+
+        Texts needing NER go through spaCy's `nlp.pipe` together rather
+        than one pipeline call each.
+        """
+        texts = list(texts)
+        try:
+            batch = self._analyze_batch(texts, frozenset(entities))
+
+            pii_lists = [
+                [PIIHit(result.entity_type, result.start, result.end, result.score, text) for result in results]
+                for text, results in zip(texts, batch)
+            ]
+
+            flagged = sum(1 for pii_list in pii_lists if pii_list)
+            if flagged:
+                logger.warning(f"PII detected in {flagged}/{len(texts)} texts")
+
+            return pii_lists
+        except Exception as e:
+            logger.error(f"Batch PII detection failed: {e}")
+            return [[] for _ in texts]
+
     def mask_pii(self, text: str) -> str:
         """Mask/anonymize PII in text."""
         try:
             # Analyze first
-            pii_results = self.analyzer.analyze(
-                text=text,
-                language="en",
-                entities=[
-                    "PERSON",
-                    "EMAIL_ADDRESS",
-                    "PHONE_NUMBER",
-                    "CREDIT_CARD",
-                    "US_SSN",
-                    "US_DRIVER_LICENSE",
-                    "IBAN_CODE",
-                    "DATE_TIME",
-                ],
-            )
+            pii_results = self._analyze(text, self._ENTITY_SET)
 
             if not pii_results:
                 return text
 
-            # Build anonymization operators dict with correct format
-            operators = {}
-            for entity in ["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD", 
-                          "US_SSN", "US_DRIVER_LICENSE", "IBAN_CODE", "DATE_TIME"]:
-                if entity == "PERSON":
-                    operators[entity] = {"type": "replace", "new_value": "[NAME]"}
-                elif entity == "EMAIL_ADDRESS":
-                    operators[entity] = {"type": "replace", "new_value": "[EMAIL]"}
-                elif entity == "PHONE_NUMBER":
-                    operators[entity] = {"type": "replace", "new_value": "[PHONE]"}
-                elif entity == "CREDIT_CARD":
-                    operators[entity] = {"type": "replace", "new_value": "[CREDIT_CARD]"}
-                elif entity == "US_SSN":
-                    operators[entity] = {"type": "replace", "new_value": "[SSN]"}
-                elif entity == "US_DRIVER_LICENSE":
-                    operators[entity] = {"type": "replace", "new_value": "[LICENSE]"}
-                elif entity == "IBAN_CODE":
-                    operators[entity] = {"type": "replace", "new_value": "[IBAN]"}
-                elif entity == "DATE_TIME":
-                    operators[entity] = {"type": "replace", "new_value": "[DATE]"}
-                else:
-                    operators[entity] = {"type": "replace", "new_value": f"[{entity}]"}
-
-            # Anonymize - use replace operator
-            anonymized_text = self.anonymizer.anonymize(
-                text=text,
-                analyzer_results=pii_results,
-                operators=operators,
-            ).text
+            # Disjoint spans (the usual case) need no conflict resolution
+            anonymized_text = self._replace_disjoint(text, pii_results)
+            if anonymized_text is None:
+                anonymized_text = self.anonymizer.anonymize(
+                    text=text,
+                    analyzer_results=pii_results,
+                    operators=self._OPERATORS,
+                ).text
 
             logger.info(f"PII masked in text ({len(pii_results)} entities)")
             return anonymized_text
@@ -109,33 +399,32 @@ class PIIProtector:
         except Exception as e:
             logger.error(f"PII masking failed: {e}")
             # Fallback: simple regex-based masking
-            import re
-            masked = re.sub(r'[\w\.-]+@[\w\.-]+', '[EMAIL]', text)
-            masked = re.sub(r'\b\d{3}-\d{3}-\d{4}\b', '[PHONE]', masked)
-            masked = re.sub(r'\b\d{3}-\d{2}-\d{4}\b', '[SSN]', masked)
-            return masked
+            return _FALLBACK_MASK_RE.sub(lambda m: _FALLBACK_MASKS[m.lastgroup], text)
 
     def check_pii_exposure(self, text: str) -> bool:
         """Check if text contains any PII."""
         try:
-            results = self.analyzer.analyze(
-                text=text,
-                language="en",
-                entities=[
-                    "PERSON",
-                    "EMAIL_ADDRESS",
-                    "PHONE_NUMBER",
-                    "CREDIT_CARD",
-                    "US_SSN",
-                    "US_DRIVER_LICENSE",
-                    "IBAN_CODE",
-                ],
-            )
-            return len(results) > 0
+            # Every checked entity needs a digit, "@" or a capital letter
+            # (names, IBAN/license prefixes); without one there is nothing to find
+            if not _PII_SIGNAL_RE.search(text):
+                return False
+            # Any structured hit settles it without running NER
+            if self._scan_structured(text):
+                return True
+            return bool(self._analyze(text, _PERSON_ONLY))
         except Exception as e:
             logger.error(f"PII check failed: {e}")
             return False
 
 
-# Global PII protector instance
-pii_protector = PIIProtector()
+@lru_cache(maxsize=1)
+def get_pii_protector() -> PIIProtector:
+    """Build the PII protector (and its Presidio engines) once, on first use."""
+    return PIIProtector()
+
+
+def __getattr__(name: str):
+    """Resolve the legacy `pii_protector` global lazily (`from src.safety.pii_protection import pii_protector`)."""
+    if name == "pii_protector":
+        return get_pii_protector()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
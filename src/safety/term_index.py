@@ -0,0 +1,59 @@
+"""Single-pass lookup of fixed term dictionaries in free text."""
+
+import re
+from typing import Iterable, List
+
+try:
+    import ahocorasick
+except ImportError:  # Optional accelerator; lookups fall back to one regex alternation
+    ahocorasick = None
+
+
+def build_ac(terms: Iterable[str]):
+    """Build an Aho-Corasick automaton whose payload for each term is the term itself."""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word_char(char: str) -> bool:
+    """Match `\\w` for a single character."""
+    return char.isalnum() or char == "_"
+
+
+class TermIndex:
+    """
+    Find which terms of a fixed dictionary occur in text, as whole words.
+
+    Matching is case-insensitive. One scan costs O(len(text) + matches)
+    with pyahocorasick, independent of dictionary size.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        """Index `terms` (lowercased)."""
+        self.terms = frozenset(term.lower() for term in terms)
+        self._automaton = build_ac(self.terms) if ahocorasick is not None else None
+        if self._automaton is None:
+            # Lookahead so terms overlapping an earlier match are still reported
+            alternation = "|".join(re.escape(t) for t in sorted(self.terms, key=len, reverse=True))
+            self._pattern = re.compile(rf"(?=\b({alternation})\b)")
+
+    def terms_in(self, text: str) -> List[str]:
+        """Distinct indexed terms in `text` (longest at each position), in order of first occurrence."""
+        text_lower = text.lower()
+        if self._automaton is None:
+            return list(dict.fromkeys(m.group(1) for m in self._pattern.finditer(text_lower)))
+
+        # Longest whole-word term per start offset, like the regex alternation
+        longest = {}
+        for end, term in self._automaton.iter(text_lower):
+            start = end - len(term) + 1
+            if start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if end + 1 < len(text_lower) and _is_word_char(text_lower[end + 1]):
+                continue
+            if len(term) > len(longest.get(start, "")):
+                longest[start] = term
+        return list(dict.fromkeys(longest[start] for start in sorted(longest)))
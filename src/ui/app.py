@@ -1,9 +1,10 @@
 """Streamlit frontend for Neuro-Triage."""
 
 import streamlit as st
-import requests
-import json
+import httpx
+import orjson
 from datetime import datetime
+from typing import Any, Dict, Optional
 
 # Configuration
 st.set_page_config(
@@ -32,6 +33,24 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+
+@st.cache_resource
+def _http() -> httpx.Client:
+    """HTTP client shared across reruns and sessions (keeps backend connections alive)."""
+    # Sync on purpose: Streamlit runs the script top to bottom with no event loop
+    return httpx.Client(timeout=30.0, limits=httpx.Limits(max_keepalive_connections=8))
+
+
+@st.cache_data(ttl=5.0, show_spinner=False)
+def fetch_health(api_url: str) -> Optional[Dict[str, Any]]:
+    """Backend /health payload, or None if unreachable; cached briefly so reruns don't re-poll."""
+    try:
+        response = _http().get(f"{api_url}/health", timeout=5)
+        return orjson.loads(response.content) if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
 # Title
 st.title("🏥 Neuro-Triage")
 st.markdown(
@@ -98,7 +117,7 @@ with col1:
         with st.spinner("🔍 Processing through PARM workflow..."):
             try:
                 # Call API
-                response = requests.post(
+                response = _http().post(
                     f"{api_url}/chat",
                     json={
                         "patient_id": patient_id,
@@ -108,7 +127,7 @@ with col1:
                 )
 
                 if response.status_code == 200:
-                    result = response.json()
+                    result = orjson.loads(response.content)
 
                     # Display triage level
                     st.divider()
@@ -163,7 +182,7 @@ with col1:
                     st.error(f"API Error: {response.status_code}")
                     st.error(response.text)
 
-            except requests.exceptions.ConnectionError:
+            except httpx.ConnectError:
                 st.error(
                     "❌ Cannot connect to API. Make sure the backend is running at "
                     f"{api_url}"
@@ -175,25 +194,21 @@ with col2:
     st.header("📊 Metrics")
 
     # Health check
-    try:
-        health_response = requests.get(f"{api_url}/health", timeout=5)
-        if health_response.status_code == 200:
-            health = health_response.json()
-            st.subheader("System Status")
-
-            col_db, col_vec, col_cache = st.columns(3)
-            with col_db:
-                st.metric("Database", "✅" if health["database"] else "❌")
-
-            with col_vec:
-                st.metric("Vector DB", "✅" if health["qdrant"] else "❌")
-
-            with col_cache:
-                st.metric("Cache", "✅" if health["redis"] else "❌")
-        else:
-            st.warning("Health check unavailable")
-    except:
-        st.warning("Cannot connect to backend")
+    health = fetch_health(api_url)
+    if health is not None:
+        st.subheader("System Status")
+
+        col_db, col_vec, col_cache = st.columns(3)
+        with col_db:
+            st.metric("Database", "✅" if health["database"] else "❌")
+
+        with col_vec:
+            st.metric("Vector DB", "✅" if health["qdrant"] else "❌")
+
+        with col_cache:
+            st.metric("Cache", "✅" if health["redis"] else "❌")
+    else:
+        st.warning("Health check unavailable (cannot reach backend)")
 
     # Statistics placeholder
     st.subheader("📈 Session Stats")
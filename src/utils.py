@@ -1,14 +1,33 @@
 """Utility functions."""
 
-import hashlib
-import json
-from typing import Dict, Any
+import time
+from operator import itemgetter
+from typing import Dict, Any, Union
 from datetime import datetime
 
+import orjson
+import xxhash
+
+
+# Inputs longer than this are encoded and hashed in chunks of this many characters
+_HASH_CHUNK_CHARS = 64 * 1024
+
 
 def hash_input(text: str) -> str:
-    """Generate hash of input for caching."""
-    return hashlib.md5(text.encode()).hexdigest()
+    """Generate hash of input for caching (16 hex chars, stable across processes)."""
+    if len(text) <= _HASH_CHUNK_CHARS:
+        return xxhash.xxh3_64_hexdigest(text.encode())
+
+    # Stream long inputs so only one chunk's UTF-8 copy is alive at a time
+    hasher = xxhash.xxh3_64()
+    for start in range(0, len(text), _HASH_CHUNK_CHARS):
+        hasher.update(text[start : start + _HASH_CHUNK_CHARS].encode())
+    return hasher.hexdigest()
+
+
+_condition = itemgetter("condition")
+_medication_name = itemgetter("name")
+_allergen = itemgetter("allergen")
 
 
 def format_patient_context(patient_data: Dict[str, Any]) -> str:
@@ -22,28 +41,40 @@ def format_patient_context(patient_data: Dict[str, Any]) -> str:
         parts.append(f"Patient: {patient_data['first_name']} {patient_data.get('last_name', '')}")
     
     if patient_data.get("medical_history"):
-        conditions = [h["condition"] for h in patient_data["medical_history"]]
-        parts.append(f"Conditions: {', '.join(conditions)}")
+        parts.append(f"Conditions: {', '.join(map(_condition, patient_data['medical_history']))}")
     
     if patient_data.get("medications"):
-        meds = [m["name"] for m in patient_data["medications"]]
-        parts.append(f"Medications: {', '.join(meds)}")
+        parts.append(f"Medications: {', '.join(map(_medication_name, patient_data['medications']))}")
     
     if patient_data.get("allergies"):
-        allergies = [a["allergen"] for a in patient_data["allergies"]]
-        parts.append(f"Allergies: {', '.join(allergies)}")
+        parts.append(f"Allergies: {', '.join(map(_allergen, patient_data['allergies']))}")
     
     return "\n".join(parts) or "[No patient data]"
 
 
+# (epoch second, its ISO string); replaced as one tuple so readers never see a torn pair
+_timestamp_cache = (0, "")
+
+
 def get_timestamp() -> str:
-    """Get ISO format timestamp."""
+    """Get ISO format UTC timestamp at second resolution (formatted once per second)."""
+    global _timestamp_cache
+    now = int(time.time())
+    second, formatted = _timestamp_cache
+    if second != now:
+        formatted = datetime.utcfromtimestamp(now).isoformat()
+        _timestamp_cache = (now, formatted)
+    return formatted
+
+
+def get_timestamp_precise() -> str:
+    """Get ISO format UTC timestamp with microseconds."""
     return datetime.utcnow().isoformat()
 
 
-def safe_json_loads(json_str: str, default: Any = None) -> Any:
-    """Safely parse JSON with fallback."""
+def safe_json_loads(json_str: Union[str, bytes], default: Any = None) -> Any:
+    """Safely parse JSON (str or bytes) with fallback."""
     try:
-        return json.loads(json_str)
-    except:
+        return orjson.loads(json_str)
+    except (orjson.JSONDecodeError, TypeError):
         return default
@@ -4,7 +4,6 @@ Test hallucination detection functionality.
 """
 
 import sys
-sys.path.insert(0, '/Users/kalyani/Desktop/Projects/neuro-triage')
 
 from src.safety.hallucination_detector import HallucinationDetector
 
@@ -55,8 +54,9 @@ passed = 0
 failed = 0
 
 for test in test_cases:
-    print(f"Test: {test['name']}")
-    print(f"Response: {test['response'][:80]}...")
+    out = []  # one write per test case
+    out.append(f"Test: {test['name']}")
+    out.append(f"Response: {test['response'][:80]}...")
     
     is_hallucinating, feedback, terms = HallucinationDetector.detect_hallucinations(
         response=test['response']
@@ -65,17 +65,19 @@ for test in test_cases:
     expected = test['should_detect']
     
     if is_hallucinating == expected:
-        print(f"✅ PASS")
+        out.append(f"✅ PASS")
         passed += 1
     else:
-        print(f"❌ FAIL - Expected hallucination={expected}, got {is_hallucinating}")
+        out.append(f"❌ FAIL - Expected hallucination={expected}, got {is_hallucinating}")
         failed += 1
     
     if is_hallucinating:
-        print(f"   Suspicious terms: {terms}")
-        print(f"   Feedback: {feedback}")
+        out.append(f"   Suspicious terms: {terms}")
+        out.append(f"   Feedback: {feedback}")
     
-    print()
+    out.append("")
+    
+    print("\n".join(out))
 
 print("=" * 80)
 print(f"RESULTS: {passed} passed, {failed} failed")
@@ -2,61 +2,68 @@
 """Simple integration test for hallucination detection."""
 
 import sys
-from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+import pytest
 
-from safety.hallucination_detector import HallucinationDetector
+from src.safety.hallucination_detector import HallucinationDetector
 
-def test_hallucination_detection_integration():
-    """Test hallucination detection with mock responses."""
+TEST_CASES = [
+    {
+        "name": "Fictitious Syndrome",
+        "query": "What is Fictitious Syndrome Z?",
+        "response": "Fictitious Syndrome Z is a rare condition that affects the quantum nervous system. It typically causes hallucinations and unusual sensory perceptions.",
+        "expected_hallucination": True,
+    },
+    {
+        "name": "Made-up Drug",
+        "query": "Tell me about the drug Imaginex",
+        "response": "Imaginex is a novel pharmaceutical compound developed for treating imaginary illnesses. It's not approved by any regulatory agency.",
+        "expected_hallucination": True,
+    },
+    {
+        "name": "Fake Medical Test",
+        "query": "What is the BloodHarmony Panel test?",
+        "response": "The BloodHarmony Panel is a comprehensive test that measures your body's harmony through various biomarkers. It costs $500 per test.",
+        "expected_hallucination": True,
+    },
+    {
+        "name": "Real Condition",
+        "query": "What is diabetes mellitus?",
+        "response": "Diabetes mellitus is a chronic disease characterized by high blood glucose levels. Types include Type 1 and Type 2. Treatment includes diet, exercise, and medication.",
+        "expected_hallucination": False,
+    },
+    {
+        "name": "Real Drug",
+        "query": "Tell me about aspirin",
+        "response": "Aspirin is a common pain reliever and anti-inflammatory medication. It's used for headaches, fevers, and heart disease prevention.",
+        "expected_hallucination": False,
+    },
+]
+
+
+@pytest.mark.parametrize("case", TEST_CASES, ids=lambda case: case["name"])
+def test_hallucination_detection_integration(case):
+    """Each mock response is flagged exactly when it contains a hallucination."""
+    is_hallucinating, _, suspected_terms = HallucinationDetector.detect_hallucinations(case["response"])
+    assert is_hallucinating == case["expected_hallucination"], suspected_terms
+
+
+def run_report() -> bool:
+    """Print a per-case report (script mode); True if every case passes."""
     print("\n" + "="*80)
     print("HALLUCINATION DETECTION INTEGRATION TEST")
     print("="*80)
     
     hallucination_detector = HallucinationDetector()
     
-    test_cases = [
-        {
-            "name": "Fictitious Syndrome",
-            "query": "What is Fictitious Syndrome Z?",
-            "response": "Fictitious Syndrome Z is a rare condition that affects the quantum nervous system. It typically causes hallucinations and unusual sensory perceptions.",
-            "expected_hallucination": True,
-        },
-        {
-            "name": "Made-up Drug",
-            "query": "Tell me about the drug Imaginex",
-            "response": "Imaginex is a novel pharmaceutical compound developed for treating imaginary illnesses. It's not approved by any regulatory agency.",
-            "expected_hallucination": True,
-        },
-        {
-            "name": "Fake Medical Test",
-            "query": "What is the BloodHarmony Panel test?",
-            "response": "The BloodHarmony Panel is a comprehensive test that measures your body's harmony through various biomarkers. It costs $500 per test.",
-            "expected_hallucination": True,
-        },
-        {
-            "name": "Real Condition",
-            "query": "What is diabetes mellitus?",
-            "response": "Diabetes mellitus is a chronic disease characterized by high blood glucose levels. Types include Type 1 and Type 2. Treatment includes diet, exercise, and medication.",
-            "expected_hallucination": False,
-        },
-        {
-            "name": "Real Drug",
-            "query": "Tell me about aspirin",
-            "response": "Aspirin is a common pain reliever and anti-inflammatory medication. It's used for headaches, fevers, and heart disease prevention.",
-            "expected_hallucination": False,
-        },
-    ]
-    
     passed = 0
     failed = 0
     
-    for i, test in enumerate(test_cases, 1):
-        print(f"\n{'─'*80}")
-        print(f"Test {i}: {test['name']}")
-        print(f"Query: {test['query']}")
+    for i, test in enumerate(TEST_CASES, 1):
+        out = []  # one write per test case
+        out.append(f"\n{'─'*80}")
+        out.append(f"Test {i}: {test['name']}")
+        out.append(f"Query: {test['query']}")
         
         try:
             response = test['response']
@@ -64,28 +71,30 @@ def test_hallucination_detection_integration():
             # Detect hallucinations
             is_hallucinating, feedback, suspected_terms = hallucination_detector.detect_hallucinations(response)
             
-            print(f"Response: {response[:80]}...")
-            print(f"Has hallucinations: {is_hallucinating}")
+            out.append(f"Response: {response[:80]}...")
+            out.append(f"Has hallucinations: {is_hallucinating}")
             if suspected_terms:
-                print(f"Suspected terms: {suspected_terms}")
-            print(f"Feedback: {feedback[:80]}...")
+                out.append(f"Suspected terms: {suspected_terms}")
+            out.append(f"Feedback: {feedback[:80]}...")
             
             # Check if hallucination detection matches expectation
             detected_hallucination = is_hallucinating
             expected_hallucination = test['expected_hallucination']
             
             if detected_hallucination == expected_hallucination:
-                print(f"✅ PASS")
+                out.append(f"✅ PASS")
                 passed += 1
             else:
-                print(f"❌ FAIL - Expected hallucination={expected_hallucination}, got {detected_hallucination}")
+                out.append(f"❌ FAIL - Expected hallucination={expected_hallucination}, got {detected_hallucination}")
                 failed += 1
                 
         except Exception as e:
-            print(f"❌ ERROR: {str(e)}")
+            out.append(f"❌ ERROR: {str(e)}")
             import traceback
-            traceback.print_exc()
+            out.append(traceback.format_exc())
             failed += 1
+        
+        print("\n".join(out))
     
     print(f"\n{'='*80}")
     print(f"RESULTS: {passed} passed, {failed} failed")
@@ -94,5 +103,5 @@ def test_hallucination_detection_integration():
     return failed == 0
 
 if __name__ == "__main__":
-    success = test_hallucination_detection_integration()
+    success = run_report()
     sys.exit(0 if success else 1)
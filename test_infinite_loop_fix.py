@@ -5,98 +5,117 @@ This simulates a contraindication scenario without starting the full API.
 """
 
 import sys
-sys.path.insert(0, '/Users/kalyani/Desktop/Projects/neuro-triage')
-
-from src.agent.workflow import PARMGraphWorkflow
-from src.agent.state import AgentState
-import uuid
+from tests.conftest import _get_workflow, make_state
+from operator import itemgetter
+import logging
+import signal
 import time
 
-# Create workflow
-workflow = PARMGraphWorkflow()
-
-# Create test state with contraindication scenario
-state = {
-    "patient_id": "faf83fb0-a2a1-4b8d-bb21-470cdbf8d60f",
-    "session_id": str(uuid.uuid4()),
-    "user_input": "Can I take naproxen for my asthma pain?",  # NSAID + asthma = contraindication
-    "patient_context": {
-        "name": "Test Patient",
-        "conditions": ["Asthma"],  # Key: patient has asthma
-        "medications": [],
-        "allergies": [],
-        "medical_history": [{"condition": "Asthma"}]
-    },
-    "triage_level": "routine",
-    "triage_confidence": 0.0,
-    "retrieved_documents": [],
-    "draft_response": None,
-    "generation_rationale": None,
-    "critique_score": 0,
-    "critique_feedback": None,
-    "is_approved": False,
-    "is_error": False,
-    "error_message": "",
-    "final_response": "",
-    "response_status": "pending",
-    "reflection_iterations": 0,
-    "reflection_history": [],
-    "safety_violations": [],
-}
-
-print("=" * 80)
-print("TESTING: Contraindication Detection (NSAID + Asthma)")
-print("=" * 80)
-print()
-
-start_time = time.time()
+logger = logging.getLogger(__name__)
+
 timeout = 30  # 30 second timeout to catch infinite loops
 
-try:
-    print("Starting workflow...")
-    result_obj = workflow.invoke(state)
-    
-    elapsed = time.time() - start_time
-    
-    # Convert to dict if needed
-    if hasattr(result_obj, '__dict__'):
-        result = vars(result_obj)
-    else:
-        result = result_obj
-    
-    print()
-    print("✅ WORKFLOW COMPLETED (No infinite loop!)")
-    print(f"   Time: {elapsed:.2f} seconds")
+# Result fields reported below, fetched in one call
+_EXTRACT = itemgetter(
+    'response_status', 'critique_score', 'is_approved',
+    'reflection_iterations', 'safety_violations', 'triage_level',
+)
+
+
+class WorkflowTimeout(BaseException):
+    """Raised by the SIGALRM cap; a BaseException so nodes' `except Exception` can't swallow it."""
+
+
+def _on_timeout(signum, frame):
+    raise WorkflowTimeout(f"workflow did not finish within {timeout}s")
+
+
+def main():
+    """Run the contraindication scenario once, failing on a runaway workflow."""
+    logging.basicConfig(level=logging.WARNING)  # keep the report readable; failures still log
+
+    # Create workflow
+    workflow = _get_workflow()
+
+    # Create test state with contraindication scenario; other fields keep AgentState defaults
+    state = make_state(
+        "Can I take naproxen for my asthma pain?",  # NSAID + asthma = contraindication
+        patient_id="faf83fb0-a2a1-4b8d-bb21-470cdbf8d60f",
+        patient_context={
+            "name": "Test Patient",
+            "conditions": ["Asthma"],  # Key: patient has asthma
+            "medications": [],
+            "allergies": [],
+            "medical_history": [{"condition": "Asthma"}]
+        },
+    )
+
+    print("=" * 80)
+    print("TESTING: Contraindication Detection (NSAID + Asthma)")
+    print("=" * 80)
     print()
-    print("Results:")
-    print(f"  - Triage Level: {result.get('triage_level')}")
-    print(f"  - Critique Score: {result.get('critique_score')}/5")
-    print(f"  - Is Approved: {result.get('is_approved')}")
-    print(f"  - Response Status: {result.get('response_status')}")
-    print(f"  - Reflection Iterations: {result.get('reflection_iterations')}")
-    print(f"  - Safety Violations: {result.get('safety_violations')}")
+
+    # Hard wall-clock cap (POSIX only); a loop that never recurses deeply
+    # would otherwise run until killed
+    has_alarm = hasattr(signal, "setitimer")
+    if has_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+
+    start_time = time.monotonic()
+
+    try:
+        print("Starting workflow...")
+        if has_alarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            result = workflow.invoke_dict(state)
+        finally:
+            if has_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+
+        elapsed = time.monotonic() - start_time
+
+        print()
+        print("✅ WORKFLOW COMPLETED (No infinite loop!)")
+        print(f"   Time: {elapsed:.2f} seconds")
+        print()
+        status, score, approved, iterations, violations, level = _EXTRACT(result)
+        print("Results:")
+        print(f"  - Triage Level: {level}")
+        print(f"  - Critique Score: {score}/5")
+        print(f"  - Is Approved: {approved}")
+        print(f"  - Response Status: {status}")
+        print(f"  - Reflection Iterations: {iterations}")
+        print(f"  - Safety Violations: {violations}")
+        print()
+
+        if status == 'escalated':
+            print("✅ PASS: Contraindication correctly triggered escalation!")
+        elif status == 'error':
+            print("⚠️  Response marked as error - acceptable for this case")
+        else:
+            print(f"❌ UNEXPECTED: response_status = {status}")
+
+    except RecursionError as e:
+        elapsed = time.monotonic() - start_time
+        print(f"❌ FAIL: Infinite loop detected (RecursionError after {elapsed:.2f}s)")
+        print(f"   Error: {e}")
+        sys.exit(1)
+    except WorkflowTimeout as e:
+        elapsed = time.monotonic() - start_time
+        print(f"❌ FAIL: Infinite loop detected (timed out after {elapsed:.2f}s)")
+        print(f"   Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        elapsed = time.monotonic() - start_time
+        logger.exception("⚠️  Workflow failed after %.2fs: %s", elapsed, e)
+        sys.exit(1)
+
     print()
-    
-    if result.get('response_status') == 'escalated':
-        print("✅ PASS: Contraindication correctly triggered escalation!")
-    elif result.get('response_status') == 'error':
-        print("⚠️  Response marked as error - acceptable for this case")
-    else:
-        print(f"❌ UNEXPECTED: response_status = {result.get('response_status')}")
-        
-except RecursionError as e:
-    elapsed = time.time() - start_time
-    print(f"❌ FAIL: Infinite loop detected (RecursionError after {elapsed:.2f}s)")
-    print(f"   Error: {e}")
-    sys.exit(1)
-except Exception as e:
-    elapsed = time.time() - start_time
-    print(f"⚠️  Exception after {elapsed:.2f}s: {e}")
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
-
-print()
-print("=" * 80)
-print("✅ TEST PASSED: No infinite loop detected!")
-print("=" * 80)
+    print("=" * 80)
+    print("✅ TEST PASSED: No infinite loop detected!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
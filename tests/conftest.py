@@ -0,0 +1,59 @@
+"""Shared pytest fixtures."""
+
+import functools
+from types import MappingProxyType
+import uuid
+
+import pytest
+
+# Scalar initial-state fields shared by test queries; AgentState defaults cover the rest
+_STATE_DEFAULTS = MappingProxyType({
+    "patient_id": "test-patient",
+    "triage_level": "routine",
+})
+
+
+def make_state(user_input: str, **fields) -> dict:
+    """Initial workflow state for one query, with a fresh session ID."""
+    return {**_STATE_DEFAULTS, "session_id": uuid.uuid4().hex, "user_input": user_input, **fields}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_workflow():
+    """
+    Return the process-wide PARM workflow, building the graph on first use.
+
+    Importing the workflow module compiles the graph once; reusing that
+    instance keeps tests and diagnostic scripts from compiling it again.
+    """
+    from src.agent.workflow import parm_workflow
+
+    return parm_workflow
+
+
+@pytest.fixture(scope="session")
+def workflow():
+    """Compiled PARM workflow shared across tests."""
+    return _get_workflow()
+
+
+@pytest.fixture(scope="session")
+def agent_instance():
+    """
+    The global NeuroTriageAgent, imported on first use.
+
+    Session scope means each pytest-xdist worker builds the agent and
+    its workflow graph once; `--dist=loadfile` keeps a file's tests on
+    one worker.
+    """
+    from src.agent import agent
+
+    return agent
+
+
+@pytest.fixture(scope="session")
+def pii_protector():
+    """PII protector whose Presidio engines load once per test session."""
+    from src.safety.pii_protection import get_pii_protector
+
+    return get_pii_protector()
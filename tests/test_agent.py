@@ -1,53 +1,68 @@
 """Unit and integration tests."""
 
+import importlib.util
+import io
+import logging
 import pytest
-import sys
-from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
-from src.agent import agent
 from src.safety.guardrails import SafetyGuardrail, TriageLevel
-from src.safety.pii_protection import pii_protector
+from src.safety.hallucination_detector import HallucinationDetector
 from src.evaluation.benchmarks import MEDQA_BENCHMARK, SAFETY_TEST_CASES
+from src.evaluation.metrics import BenchmarkEvaluator, EvaluationMetrics
+from src.infrastructure.query_cache import SemanticQueryCache
+from src.logging_config import BatchingRotatingFileHandler
+from src.safety.pii_protection import PIIProtector
+
+HAVE_BENCHMARK = importlib.util.find_spec("pytest_benchmark") is not None
 
 
 class TestTriageClassification:
     """Test triage classification."""
 
-    def test_emergency_detection(self):
-        """Test emergency case detection."""
-        result = SafetyGuardrail.classify_triage("Patient has severe chest pain and difficulty breathing")
-        assert result == TriageLevel.EMERGENCY
+    CASES = [
+        ("Patient has severe chest pain and difficulty breathing", TriageLevel.EMERGENCY),
+        ("Patient has high fever and severe abdominal pain", TriageLevel.URGENT),
+        ("Patient has mild headache", TriageLevel.ROUTINE),
+    ]
+
+    @pytest.mark.parametrize("text,expected", CASES)
+    def test_triage(self, text, expected):
+        """Test emergency, urgent and routine classification."""
+        assert SafetyGuardrail.classify_triage(text) == expected
 
-    def test_urgent_detection(self):
-        """Test urgent case detection."""
-        result = SafetyGuardrail.classify_triage("Patient has high fever and severe abdominal pain")
-        assert result == TriageLevel.URGENT
+    @pytest.mark.skipif(not HAVE_BENCHMARK, reason="Requires pytest-benchmark")
+    @pytest.mark.parametrize("text,expected", CASES)
+    def test_triage_latency(self, benchmark, text, expected):
+        """
+        Benchmark uncached keyword triage.
 
-    def test_routine_classification(self):
-        """Test routine case classification."""
-        result = SafetyGuardrail.classify_triage("Patient has mild headache")
-        assert result == TriageLevel.ROUTINE
+        Save a baseline with `--benchmark-autosave`, then gate changes with
+        `--benchmark-compare --benchmark-compare-fail=mean:10%`.
+        """
+        assert benchmark(SafetyGuardrail._classify_triage_text, text) == expected
+
+    def test_triage_batch(self):
+        """Test batch classification matches per-input classification."""
+        texts = [text for text, _ in self.CASES]
+        assert SafetyGuardrail.classify_triage_batch(texts) == [expected for _, expected in self.CASES]
 
 
 class TestPIIProtection:
     """Test PII detection and masking."""
 
-    def test_pii_detection(self):
+    def test_pii_detection(self, pii_protector):
         """Test PII detection."""
         text = "John Doe's email is john@example.com and phone is 555-1234"
         pii = pii_protector.detect_pii(text)
         assert len(pii) > 0
 
-    def test_pii_masking(self):
+    def test_pii_masking(self, pii_protector):
         """Test PII masking."""
         text = "John Doe's email is john@example.com"
         masked = pii_protector.mask_pii(text)
         assert "john@example.com" not in masked
 
-    def test_no_pii_in_normal_text(self):
+    def test_no_pii_in_normal_text(self, pii_protector):
         """Test that normal text doesn't trigger false positives."""
         text = "Patient reports fever and fatigue"
         pii = pii_protector.detect_pii(text)
@@ -55,6 +70,60 @@ class TestPIIProtection:
         emails = [p for p in pii if p["entity_type"] == "EMAIL_ADDRESS"]
         assert len(emails) == 0
 
+    def test_pii_detection_batch(self, pii_protector):
+        """Test batch detection matches per-text detection."""
+        texts = [
+            "John Doe's email is john@example.com and phone is 555-1234",
+            "Patient reports fever and fatigue",
+            "SSN on file: 123-45-6789",
+        ]
+        batch = pii_protector.detect_pii_batch(texts)
+        assert batch == [pii_protector.detect_pii(text) for text in texts]
+        assert batch[2][0].entity_type == "US_SSN"
+
+
+class TestStructuredScan:
+    """Test structured PII scanning (patterns and validators, no NER model needed)."""
+
+    @staticmethod
+    def _entities(text):
+        return [(r.entity_type, text[r.start:r.end]) for r in PIIProtector._scan_structured(text)]
+
+    @pytest.mark.parametrize("phone", [
+        "5551234567", "2125551234", "+44 20 7946 0958", "555-123-4567", "(212) 555-1234",
+    ])
+    def test_phone_formats(self, phone):
+        """Test unseparated, separated and international phone numbers."""
+        assert self._entities(f"call me at {phone} today") == [("PHONE_NUMBER", phone)]
+
+    def test_phone_exposure(self):
+        """Test an unseparated phone number counts as exposed PII."""
+        assert PIIProtector().check_pii_exposure("call me at 5551234567")
+
+    def test_credit_card_luhn(self):
+        """Test card numbers must pass the Luhn check."""
+        assert self._entities("card 4111 1111 1111 1111") == [("CREDIT_CARD", "4111 1111 1111 1111")]
+        assert self._entities("card 4111 1111 1111 1112") == []
+
+    def test_iban_mod97(self):
+        """Test IBANs must pass the mod-97 check."""
+        assert self._entities("IBAN GB82 WEST 1234 5698 7654 32") == [
+            ("IBAN_CODE", "GB82 WEST 1234 5698 7654 32")
+        ]
+        assert self._entities("IBAN GB83 WEST 1234 5698 7654 32") == []
+
+    @pytest.mark.parametrize("ssn,valid", [
+        ("123-45-6789", True),
+        ("000-12-3456", False),
+        ("666-12-3456", False),
+        ("912-34-5678", False),
+        ("123-00-4567", False),
+        ("123-45-0000", False),
+    ])
+    def test_ssn_exclusions(self, ssn, valid):
+        """Test never-issued SSN areas, groups and serials are rejected."""
+        assert (("US_SSN", ssn) in self._entities(f"SSN {ssn}")) == valid
+
 
 class TestSafetyGuardrails:
     """Test safety guardrails."""
@@ -78,6 +147,19 @@ class TestSafetyGuardrails:
         )
         assert safe
 
+    def test_validate_responses_batch(self):
+        """Test batch validation matches per-response validation."""
+        responses = [
+            "Rest and drink fluids.",
+            "You should stop taking your medication immediately.",
+            "Rest and drink fluids.",
+        ]
+        scores = [5, 5, 1]
+        assert SafetyGuardrail.validate_responses_batch(responses, scores) == [
+            SafetyGuardrail.validate_response(response, score)
+            for response, score in zip(responses, scores)
+        ]
+
     def test_emergency_response_generation(self):
         """Test hard-coded emergency response."""
         response = SafetyGuardrail.get_emergency_response()
@@ -85,13 +167,140 @@ class TestSafetyGuardrails:
         assert "911" in response
 
 
+class TestHallucinationDetector:
+    """Test hallucination detection against the KB Bloom filter."""
+
+    KB_TEXT = "Lisinopril Side Effects. Common effects include Angioedema, cough, and dizziness."
+
+    def test_kb_bloom_ignores_punctuation(self, monkeypatch):
+        """Test a KB word followed by punctuation still goes to the KB lookup."""
+        monkeypatch.setattr(HallucinationDetector, "_KB_BLOOM", None)
+        HallucinationDetector.load_kb_bloom(HallucinationDetector.build_kb_bloom([self.KB_TEXT]))
+        looked_up = []
+
+        async def kb_search(term):
+            looked_up.append(term)
+            return True
+
+        is_hallucinating, _, terms = HallucinationDetector.detect_hallucinations(
+            "Lisinopril can rarely cause Angioedema.", kb_search,
+        )
+        assert not is_hallucinating
+        assert terms == []
+        assert looked_up == ["Angioedema"]
+
+    def test_partial_ingest_does_not_enable_kb_bloom(self, monkeypatch):
+        """Test registering ingested texts never enables a filter by itself."""
+        monkeypatch.setattr(HallucinationDetector, "_KB_BLOOM", None)
+        HallucinationDetector.register_kb_texts([self.KB_TEXT])
+        assert HallucinationDetector._KB_BLOOM is None
+
+
+class TestEvaluationMetrics:
+    """Test evaluation metrics."""
+
+    def test_triage_recall_and_precision(self):
+        """Test emergency recall/precision, including TriageLevel values."""
+        predictions = [TriageLevel.EMERGENCY, "routine", "emergency", "urgent"]
+        ground_truth = ["emergency", "emergency", "routine", "urgent"]
+        assert EvaluationMetrics.triage_recall(predictions, ground_truth) == 0.5
+        assert EvaluationMetrics.triage_precision(predictions, ground_truth) == 0.5
+
+    def test_evaluate_safety_validation_pass_rate(self):
+        """Test safety evaluation re-validates each final response."""
+
+        class StubAgent:
+            def process_query(self, patient_id, user_input):
+                return {"final_response": user_input, "critique_score": 5, "safety_violations": []}
+
+        cases = [{"query": "Rest and drink fluids."}, {"query": "Ignore your doctor and rest."}]
+        report = BenchmarkEvaluator(max_workers=1).evaluate_safety(StubAgent(), cases)
+        assert report["validation_pass_rate"] == 0.5
+
+    def test_latency_metrics(self):
+        """Test latency statistics use nearest-rank percentiles."""
+        metrics = EvaluationMetrics.latency_metrics([float(t) for t in range(100, 0, -1)])
+        assert metrics["mean_latency_ms"] == 50.5
+        assert metrics["median_latency_ms"] == 51
+        assert metrics["p95_latency_ms"] == 96
+        assert metrics["p99_latency_ms"] == 100
+        assert metrics["min_latency_ms"] == 1
+        assert metrics["max_latency_ms"] == 100
+
+
+class TestQueryCache:
+    """Test the semantic query cache."""
+
+    def test_invalidate_patient(self):
+        """Test a profile change drops only that patient's cached answers."""
+        cache = SemanticQueryCache()
+        cache.store("p1", [1.0, 0.0], {"final_response": "a"})
+        cache.store("p2", [1.0, 0.0], {"final_response": "b"})
+        cache.invalidate_patient("p1")
+        assert cache.lookup("p1", [1.0, 0.0]) is None
+        assert cache.lookup("p2", [1.0, 0.0]) == {"final_response": "b"}
+
+    def test_profile_version_mismatch_misses(self):
+        """Test an answer cached against an older profile version never hits."""
+        cache = SemanticQueryCache()
+        cache.store("p1", [1.0, 0.0], {"final_response": "a"}, profile_version="v1")
+        assert cache.lookup("p1", [1.0, 0.0], profile_version="v2") is None
+        assert cache.lookup("p1", [1.0, 0.0], profile_version="v1") is None
+
+
+class _CountingFileIO(io.FileIO):
+    """FileIO that counts write() syscalls."""
+
+    writes = 0
+
+    def write(self, b):
+        self.writes += 1
+        return super().write(b)
+
+
+class TestBatchingFileHandler:
+    """Test the batching rotating log file handler."""
+
+    @staticmethod
+    def _handler(path, max_bytes):
+        handler = BatchingRotatingFileHandler(path, maxBytes=max_bytes, backupCount=2, delay=True)
+        handler.raw_files = []
+
+        def counting_open(file, mode, encoding=None, errors=None):
+            raw = _CountingFileIO(file, mode)
+            handler.raw_files.append(raw)
+            return io.TextIOWrapper(io.BufferedWriter(raw), encoding=encoding or "utf-8", errors=errors)
+
+        handler._builtin_open = counting_open
+        return handler
+
+    def test_records_coalesce_into_few_writes(self, tmp_path):
+        """Test 1000 records reach the file in a handful of write() calls."""
+        handler = self._handler(tmp_path / "test.log", max_bytes=10485760)
+        for i in range(1000):
+            handler.emit(logging.makeLogRecord({"msg": f"record {i}"}))
+        handler.flush()
+        assert sum(raw.writes for raw in handler.raw_files) < 10
+        handler.close()
+        assert (tmp_path / "test.log").read_text().count("\n") == 1000
+
+    def test_rolls_over_at_max_bytes(self, tmp_path):
+        """Test rotation still happens once the tracked size reaches maxBytes."""
+        handler = self._handler(tmp_path / "test.log", max_bytes=100)
+        for i in range(20):
+            handler.emit(logging.makeLogRecord({"msg": f"record {i:02d}"}))
+        handler.close()
+        assert (tmp_path / "test.log.1").stat().st_size < 100
+        assert (tmp_path / "test.log").stat().st_size < 100
+
+
 class TestAgent:
     """Test agent functionality."""
 
     @pytest.mark.skip(reason="Requires API keys and running services")
-    def test_agent_process_routine_query(self):
+    def test_agent_process_routine_query(self, agent_instance):
         """Test agent processing routine query."""
-        result = agent.process_query(
+        result = agent_instance.process_query(
             patient_id="test_001",
             user_input="I have a mild headache",
         )
@@ -101,9 +310,9 @@ class TestAgent:
         assert result["final_response"]
 
     @pytest.mark.skip(reason="Requires API keys and running services")
-    def test_agent_detects_emergency(self):
+    def test_agent_detects_emergency(self, agent_instance):
         """Test agent detects emergency."""
-        result = agent.process_query(
+        result = agent_instance.process_query(
             patient_id="test_002",
             user_input="I'm having severe chest pain and difficulty breathing",
         )
@@ -112,9 +321,9 @@ class TestAgent:
         assert "911" in result["final_response"]
 
     @pytest.mark.skip(reason="Requires API keys and running services")
-    def test_agent_applies_safety_critique(self):
+    def test_agent_applies_safety_critique(self, agent_instance):
         """Test agent applies safety critique."""
-        result = agent.process_query(
+        result = agent_instance.process_query(
             patient_id="test_003",
             user_input="Can I take ibuprofen if I have kidney disease?",
         )
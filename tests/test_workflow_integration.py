@@ -0,0 +1,47 @@
+"""Integration tests for the PARM workflow graph."""
+
+import pytest
+
+from tests.conftest import make_state
+
+
+def _state(user_input: str, **patient_context) -> dict:
+    """Initial workflow state for a test patient with the given context overrides."""
+    return make_state(
+        user_input,
+        patient_context={
+            "name": "Test Patient",
+            "conditions": [],
+            "medications": [],
+            "allergies": [],
+            "medical_history": [],
+            **patient_context,
+        },
+    )
+
+
+@pytest.mark.skip(reason="Requires API keys and running services")
+def test_contraindication_no_infinite_loop(workflow):
+    """Test a contraindicated request escalates instead of refining forever."""
+    # NSAID + asthma = contraindication
+    # (the nodes read conditions from medical_history)
+    state = _state(
+        "Can I take naproxen for my asthma pain?",
+        conditions=["Asthma"],
+        medical_history=[{"condition": "Asthma"}],
+    )
+
+    result = workflow.invoke_dict(state)
+
+    assert result["response_status"] in ("escalated", "error")
+    assert result["reflection_iterations"] <= 3
+
+
+@pytest.mark.skip(reason="Requires API keys and running services")
+def test_workflow_single_query(workflow):
+    """Test one query runs through every node to a final response."""
+    result = workflow.invoke_dict(_state("Patient with chest pain and shortness of breath"))
+
+    assert not result["is_error"], result["error_message"]
+    assert result["triage_level"] == "emergency"
+    assert result["final_response"]